@@ -1,28 +1,30 @@
 import dash
 from dash import dcc, html, Input, Output, dash_table
 import plotly.express as px
-import yfinance as yf
 import pandas as pd
+import fundamentals
+import relative_analysis
+import store
+import universe
 
-# Lists of stocks in different sectors
-hardware_tickers = ['AAPL', 'NVDA', 'INTC']
-software_tickers = ['MSFT', 'ORCL', 'ADBE']
-digital_media_tickers = ['GOOGL', 'META', 'NFLX']
-crypto_tickers = ['BTC-USD', 'DOGE-USD', 'ETH-USD', 'SOL-USD', 'ADA-USD']  # Cryptocurrencies
+# Lists of stocks in different sectors, from the universe file app.py uses too
+members = universe.load()
+hardware_tickers = universe.tickers(members, 'equity', 'Hardware')
+software_tickers = universe.tickers(members, 'equity', 'Software')
+digital_media_tickers = universe.tickers(members, 'equity', 'Digital Media')
+crypto_tickers = universe.tickers(members, asset_class='crypto')  # Cryptocurrencies
 
 # Download data for S&P 500 and NASDAQ
-index_tickers = ['^GSPC', '^IXIC']  # S&P 500 and NASDAQ
-index_data = yf.download(index_tickers, period="5d")
+index_tickers = universe.tickers(members, asset_class='index')  # S&P 500 and NASDAQ
+index_data = store.download(index_tickers, period="5d")
 index_data = index_data.ffill().bfill()
 
 # Function to fetch stock data
 def fetch_stock_data(tickers):
-    data = yf.download(tickers, period="5d")
+    data = store.download(tickers, period="5d")
     data = data.ffill().bfill()
     return data
 
-import plotly.graph_objs as go
-
 # --- Integrated content from dash.py ---
 # -*- coding: utf-8 -*-
 """ِDASH.ipynb
@@ -32,41 +34,12 @@ Original file is located at
 """
 symbols = ['AAPL', 'MSFT', 'NVDA', 'GOOGL', 'AMZN']
 def fetch_data(symbol):
-    stock = yf.Ticker(symbol)
-    hist = stock.history(period="5y")
-    hist['Pct Change'] = hist['Close'].pct_change() * 100
-    return hist
+    return relative_analysis.fetch_history(symbol)
 def create_scatter_plot(symbol):
-    sp500_data = fetch_data('^GSPC')
-    stock_data = fetch_data(symbol)
-    data = go.Scatter(
-        x=sp500_data['Close'],
-        y=stock_data['Close'],
-        mode='markers',
-        name=f"{symbol} vs S&P 500",
-        hovertemplate=(
-            f"<b>{symbol}</b><br><br>"
-            "Date: %{customdata[0]}<br>"
-            "S&P 500: %{x:.2f}<br>"
-            f"{symbol} Close: %{{y:.2f}}<br>" # Escape the curly braces around 'y'
-            f"{symbol} % Change: %{{customdata[1]:.2f}}%<br>" # Use curly braces to access customdata within the f-string
-            "Volume: %{customdata[2]:,}<br>"
-            "<extra></extra>"
-        ),
-        customdata=list(zip(stock_data.index.strftime('%Y-%m-%d'), stock_data['Pct Change'], stock_data['Volume']))
-    )
-    return data
+    return relative_analysis.scatter_figure([symbol]).data[0]
 def plot_all():
-    fig = go.Figure()
-    for symbol in symbols:
-        scatter = create_scatter_plot(symbol)
-        fig.add_trace(scatter)
-    fig.update_layout(
-        title="Stock Prices vs S&P 500",
-        xaxis_title="S&P 500 Close",
-        yaxis_title="Stock Close",
-        showlegend=True
-    )
+    # The S&P 500 is fetched once and every symbol is joined to it by date
+    fig = relative_analysis.scatter_figure(symbols)
     fig.show()
 plot_all()
 
@@ -91,25 +64,11 @@ top_growth_stocks = pct_change.sort_values(ascending=False).head(10)
 
 # Extract important metrics for each sector
 def extract_metrics(tickers):
-    metrics = {}
-    for ticker in tickers:
-        stock_info = yf.Ticker(ticker).info
-        metrics[ticker] = {
-            'Market Cap': pd.to_numeric(stock_info.get('marketCap', 0), errors='coerce'),
-            'P/E Ratio': pd.to_numeric(stock_info.get('trailingPE', 0), errors='coerce'),
-            'Volume': pd.to_numeric(stock_info.get('volume', 0), errors='coerce'),
-            'EPS (ttm)': pd.to_numeric(stock_info.get('trailingEps', 0), errors='coerce'),
-            '52 Week High': pd.to_numeric(stock_info.get('fiftyTwoWeekHigh', 0), errors='coerce'),
-            'Sales Y/Y': pd.to_numeric(stock_info.get('revenueGrowth', 0), errors='coerce'),
-            'Profit Margin': pd.to_numeric(stock_info.get('profitMargins', 0), errors='coerce'),
-            'Target Price': pd.to_numeric(stock_info.get('targetMeanPrice', 0), errors='coerce'),
-            '52 Week Low': pd.to_numeric(stock_info.get('fiftyTwoWeekLow', 0), errors='coerce'),
-            'EPS Y/Y TTM': pd.to_numeric(stock_info.get('earningsGrowth', 0), errors='coerce'),
-            'Forward P/E': pd.to_numeric(stock_info.get('forwardPE', 0), errors='coerce'),
-            'Beta': pd.to_numeric(stock_info.get('beta', 0), errors='coerce'),
-            'Avg Volume': pd.to_numeric(stock_info.get('averageVolume', 0), errors='coerce')
-        }
-    return pd.DataFrame(metrics).T
+    rows = fundamentals.fetch_rows(tickers)
+    return pd.DataFrame({ticker: rows[ticker] for ticker in tickers}, index=fundamentals.METRIC_COLUMNS).T
+
+# Fetch fundamentals for every ticker in one concurrent batch; the calls below are then served from the cache
+fundamentals.fetch_rows(hardware_tickers + software_tickers + digital_media_tickers + crypto_tickers + index_tickers)
 
 hardware_metrics = extract_metrics(hardware_tickers)
 software_metrics = extract_metrics(software_tickers)
@@ -1,95 +1,45 @@
 import dash
-from dash import dcc, html, Input, Output, dash_table
+from dash import dcc, html, ClientsideFunction, Input, Output, State, dash_table
 import plotly.express as px
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
+from flask import jsonify
+import downsample
+import figures
+import fundamentals
+import instrumentation
+import live
+import refresh
+import rollups
+import store
+import summary_table
+from dashboard_data import AGGREGATES, SECTORS, line_chart_top_companies
 
 
 
-# Lists of stocks in different sectors
-hardware_tickers = ['AAPL', 'NVDA', 'INTC']
-software_tickers = ['MSFT', 'ORCL', 'ADBE']
-digital_media_tickers = ['GOOGL', 'META', 'NFLX']
-crypto_tickers = ['BTC-USD', 'DOGE-USD', 'ETH-USD', 'SOL-USD', 'ADA-USD']  # Cryptocurrencies
-
-# Download data for S&P 500 and NASDAQ
-index_tickers = ['^GSPC', '^IXIC']  # S&P 500 and NASDAQ
-index_data = yf.download(index_tickers, period="5d")
-index_data = index_data.ffill().bfill()
-
-# Function to fetch stock data
-def fetch_stock_data(tickers):
-    data = yf.download(tickers, period="5d")
-    data = data.ffill().bfill()
-    return data
-
-# Function to fetch stock data for line chart
-def fetch_stock_data_line_chart(tickers, period="5d"):
-    data = yf.download(tickers, period=period)
-    data = data.ffill().bfill()
-    return data
-
-#line chart variables
-line_chart_top_companies = ['AAPL', 'NVDA', 'MSFT', 'GOOGL', 'AMZN']
-top_companies_data = fetch_stock_data_line_chart(line_chart_top_companies, period="5y")['Close'] 
-
-# Fetch data for each sector and cryptocurrencies
-hardware_data = fetch_stock_data(hardware_tickers)
-software_data = fetch_stock_data(software_tickers)
-digital_media_data = fetch_stock_data(digital_media_tickers)
-crypto_data = fetch_stock_data(crypto_tickers)
-
-
-# Combine all data
-all_data = pd.concat([hardware_data, software_data, digital_media_data, crypto_data], axis=1)
-
-# Calculate percentage change for the last day
-pct_change = all_data['Close'].pct_change().iloc[-1] * 100
-
-# Identify bullish and bearish stocks
-bullish_stocks = pct_change[pct_change > 0].sort_values(ascending=False)
-bearish_stocks = pct_change[pct_change < 0].sort_values(ascending=False)
-
-# Select top 10 growth stocks
-top_growth_stocks = pct_change.sort_values(ascending=False).head(10)
-
-# Extract important metrics for each sector
-def extract_metrics(tickers):
-    metrics = {}
-    for ticker in tickers:
-        stock_info = yf.Ticker(ticker).info
-        metrics[ticker] = {
-            'Market Cap': pd.to_numeric(stock_info.get('marketCap', 0), errors='coerce'),
-            'P/E Ratio': pd.to_numeric(stock_info.get('trailingPE', 0), errors='coerce'),
-            'Volume': pd.to_numeric(stock_info.get('volume', 0), errors='coerce'),
-            'EPS (ttm)': pd.to_numeric(stock_info.get('trailingEps', 0), errors='coerce'),
-            '52 Week High': pd.to_numeric(stock_info.get('fiftyTwoWeekHigh', 0), errors='coerce'),
-            'Sales Y/Y': pd.to_numeric(stock_info.get('revenueGrowth', 0), errors='coerce'),
-            'Profit Margin': pd.to_numeric(stock_info.get('profitMargins', 0), errors='coerce'),
-            'Target Price': pd.to_numeric(stock_info.get('targetMeanPrice', 0), errors='coerce'),
-            '52 Week Low': pd.to_numeric(stock_info.get('fiftyTwoWeekLow', 0), errors='coerce'),
-            'EPS Y/Y TTM': pd.to_numeric(stock_info.get('earningsGrowth', 0), errors='coerce'),
-            'Forward P/E': pd.to_numeric(stock_info.get('forwardPE', 0), errors='coerce'),
-            'Beta': pd.to_numeric(stock_info.get('beta', 0), errors='coerce'),
-            'Avg Volume': pd.to_numeric(stock_info.get('averageVolume', 0), errors='coerce')
-        }
-    return pd.DataFrame(metrics).T
-
-hardware_metrics = extract_metrics(hardware_tickers)
-software_metrics = extract_metrics(software_tickers)
-digital_media_metrics = extract_metrics(digital_media_tickers)
-crypto_metrics = extract_metrics(crypto_tickers)  # For cryptocurrencies
-
-# Adding S&P 500 and NASDAQ indices to the data
-index_metrics = extract_metrics(index_tickers)
+# Provider timings on GET /metrics include the first snapshot's fetches
+instrumentation.instrument_provider()
+
+# Summary data and sector metrics live in a snapshot that a background thread
+# refreshes; callbacks read refresh.current() and never fetch themselves.
+refresh.start()
 
 # Start building the Dash app
-app = dash.Dash(__name__)
+# Callback responses and assets are gzip/brotli compressed (flask-compress)
+app = dash.Dash(__name__, compress=True)
 
 # مسیر به فایل favicon
 app._favicon = "assets/favicon.ico"
 
+# WSGI entry point for gunicorn (Procfile: app:server)
+server = app.server
+
+# Age of the data being served, for alerting on refresh lag
+@server.route('/snapshot')
+def snapshot_status():
+    snapshot = refresh.current()
+    return jsonify(version=snapshot.version, built_at=snapshot.built_at, age_seconds=refresh.age())
+
 app.layout = html.Div(style={'backgroundColor': '#2E2E2E', 'color': 'white', 'fontFamily': 'Arial'}, children=[
     html.Link(href='https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css', rel='stylesheet'),
     
@@ -105,17 +55,36 @@ app.layout = html.Div(style={'backgroundColor': '#2E2E2E', 'color': 'white', 'fo
                     style={'margin': '10px', 'borderRadius': '5px', 'color': '#2E2E2E', 'backgroundColor': '#FFD700'})
     ], className='button-group', style={'textAlign': 'center', 'padding': '20px'}),
 
-    html.Div(id='summary-content', style={'padding': '20px', 'textAlign': 'center'}),
+    # The table behind the buttons pages, sorts and filters on the server (summary_table)
+    html.Div(id='summary-content', style={'padding': '20px', 'textAlign': 'center'}, children=[
+        html.Div("Click a button to see the stocks.", id='summary-message'),
+        dcc.Store(id='summary-table-name'),
+        html.Div(id='summary-table-container', style={'display': 'none'}, children=[
+            dash_table.DataTable(
+                id='summary-table',
+                columns=[{'name': 'Stocks', 'id': summary_table.STOCK},
+                         {'name': 'Change %', 'id': summary_table.CHANGE, 'type': 'numeric'}],
+                page_action='custom',
+                page_current=0,
+                page_size=summary_table.PAGE_SIZE,
+                sort_action='custom',
+                sort_mode='single',
+                sort_by=[],
+                filter_action='custom',
+                filter_query='',
+                style_cell={'textAlign': 'left', 'padding': '10px', 'backgroundColor': '#333', 'color': 'white'},
+                style_header={'backgroundColor': '#444', 'fontWeight': 'bold'},
+                style_filter={'backgroundColor': '#444', 'color': 'white'},
+                style_table={'width': '25%', 'margin': '0 auto'}  # عرض جدول کاهش داده شده
+            )
+        ]),
+    ]),
 
     # Dropdowns and chart for sector and metrics comparison
     html.Div([
         dcc.Dropdown(
             id='sector-selector',
-            options=[
-                {'label': 'Hardware', 'value': 'Hardware'},
-                {'label': 'Software', 'value': 'Software'},
-                {'label': 'Digital Media & Online Advertising', 'value': 'Digital Media'}
-            ],
+            options=[{'label': label, 'value': sector} for sector, (label, _) in SECTORS.items()],
             value=['Hardware'],  # Default value
             multi=True,  # Allow multiple selections
             className='dropdown',
@@ -136,7 +105,8 @@ app.layout = html.Div(style={'backgroundColor': '#2E2E2E', 'color': 'white', 'fo
                 {'label': '52 Week Low', 'value': '52 Week Low'},
                 {'label': 'EPS Y/Y TTM', 'value': 'EPS Y/Y TTM'},
                 {'label': 'Forward P/E', 'value': 'Forward P/E'},
-                {'label': 'Price', 'value': 'Price'}
+                {'label': 'Price', 'value': 'Price'},
+                {'label': 'Change % (over timeframe)', 'value': 'Change %'}
             ],
             value='Market Cap',  # Default value
             className='dropdown',
@@ -174,6 +144,16 @@ app.layout = html.Div(style={'backgroundColor': '#2E2E2E', 'color': 'white', 'fo
             value=[],
             style={'color': 'white'}
         ),
+
+        # How each sector's "Overall" bar is aggregated from its tickers
+        dcc.RadioItems(
+            id='sector-aggregate',
+            options=[{'label': label, 'value': value} for value, label in AGGREGATES.items()],
+            value='mean',
+            inline=True,
+            style={'color': 'white'},
+            inputStyle={'marginLeft': '10px', 'marginRight': '5px'}
+        ),
         
         dcc.Graph(id='comparison-chart')
     ], className='container', style={'backgroundColor': '#2E2E2E', 'color': 'white', 'marginBottom': '60px'}),
@@ -227,6 +207,19 @@ app.layout = html.Div(style={'backgroundColor': '#2E2E2E', 'color': 'white', 'fo
                                 style={'color': '#FFF', 'margin': '10px'}
                             ),
             ], className='col'),
+            html.Div([
+                # Appends new bars to the line chart every live.INTERVAL_MS instead of redrawing it
+                dcc.Checklist(
+                                id='live-toggle',
+                                options=[
+                                    {'label': 'Live Updates', 'value': 'live'}
+                                ],
+                                value=[],
+                                style={'color': '#FFF', 'margin': '10px'}
+                            ),
+                dcc.Store(id='live'),
+                dcc.Interval(id='live-interval', interval=live.INTERVAL_MS, disabled=True),
+            ], className='col'),
             
         ], className='row'),
         
@@ -242,94 +235,67 @@ app.layout = html.Div(style={'backgroundColor': '#2E2E2E', 'color': 'white', 'fo
 ])
 
 @app.callback(
-    Output('summary-content', 'children'),
+    [Output('summary-table-name', 'data'),
+     Output('summary-table', 'columns'),
+     Output('summary-message', 'style'),
+     Output('summary-table-container', 'style'),
+     Output('summary-table', 'page_current'),
+     Output('summary-table', 'sort_by'),
+     Output('summary-table', 'filter_query')],
     [Input('bullish-button', 'n_clicks'),
      Input('bearish-button', 'n_clicks'),
      Input('top10-button', 'n_clicks'),
-     Input('crypto-button', 'n_clicks')]
+     Input('crypto-button', 'n_clicks')],
+    prevent_initial_call=True
 )
 def update_summary(bullish_clicks, bearish_clicks, top10_clicks, crypto_clicks):
+    # Picks the table; its rows come from page_summary, one page at a time
     ctx = dash.callback_context
+    name = ctx.triggered[0]['prop_id'].split('.')[0][:-len('-button')]
+    title = refresh.current().tables[name].title
+    columns = [{'name': title, 'id': summary_table.STOCK},
+               {'name': 'Change %', 'id': summary_table.CHANGE, 'type': 'numeric'}]
+    return name, columns, {'display': 'none'}, {'display': 'block'}, 0, [], ''
 
-    if not ctx.triggered:
-        return "Click a button to see the stocks."
-    else:
-        button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    
-    if button_id == 'bullish-button':
-        return dash_table.DataTable(
-            columns=[{'name': 'Bullish Stocks', 'id': 'Stock'}, {'name': 'Change %', 'id': 'Change %'}],
-            data=[{'Stock': stock, 'Change %': f"{round(change, 2)}%"} for stock, change in bullish_stocks.items() if not stock.endswith('-USD')],
-            style_cell={'textAlign': 'left', 'padding': '10px', 'backgroundColor': '#333', 'color': 'white'},
-            style_header={'backgroundColor': '#444', 'fontWeight': 'bold'},
-            style_table={'width': '25%', 'margin': '0 auto'}  # عرض جدول کاهش داده شده
-        )
-    elif button_id == 'bearish-button':
-        return dash_table.DataTable(
-            columns=[{'name': 'Bearish Stocks', 'id': 'Stock'}, {'name': 'Change %', 'id': 'Change %'}],
-            data=[{'Stock': stock, 'Change %': f"{round(change, 2)}%"} for stock, change in bearish_stocks.items() if not stock.endswith('-USD')],
-            style_cell={'textAlign': 'left', 'padding': '10px', 'backgroundColor': '#333', 'color': 'white'},
-            style_header={'backgroundColor': '#444', 'fontWeight': 'bold'},
-            style_table={'width': '25%', 'margin': '0 auto'}  # عرض جدول کاهش داده شده
-        )
-    elif button_id == 'top10-button':
-        return dash_table.DataTable(
-            columns=[{'name': 'Top 10 Growth Stocks', 'id': 'Stock'}, {'name': 'Change %', 'id': 'Change %'}],
-            data=[{'Stock': stock, 'Change %': f"{round(change, 2)}%"} for stock, change in top_growth_stocks.items() if not stock.endswith('-USD')],
-            style_cell={'textAlign': 'left', 'padding': '10px', 'backgroundColor': '#333', 'color': 'white'},
-            style_header={'backgroundColor': '#444', 'fontWeight': 'bold'},
-            style_table={'width': '25%', 'margin': '0 auto'}  # عرض جدول کاهش داده شده
-        )
-    elif button_id == 'crypto-button':
-        return dash_table.DataTable(
-            columns=[{'name': 'Cryptocurrencies', 'id': 'Cryptocurrencies'}, {'name': 'Change %', 'id': 'Change %'}],
-            data=[{'Cryptocurrencies': crypto, 'Change %': f"{round(change, 2)}%"} for crypto, change in pct_change.items() if crypto.endswith('-USD')],
-            style_cell={'textAlign': 'left', 'padding': '10px', 'backgroundColor': '#333', 'color': 'white'},
-            style_header={'backgroundColor': '#444', 'fontWeight': 'bold'},
-            style_table={'width': '25%', 'margin': '0 auto'}  # عرض جدول کاهش داده شده
-        )
-    return None
+@app.callback(
+    [Output('summary-table', 'data'),
+     Output('summary-table', 'page_count')],
+    [Input('summary-table-name', 'data'),
+     Input('summary-table', 'page_current'),
+     Input('summary-table', 'page_size'),
+     Input('summary-table', 'sort_by'),
+     Input('summary-table', 'filter_query')]
+)
+def page_summary(name, page_current, page_size, sort_by, filter_query):
+    snapshot = refresh.current()
+    if name not in snapshot.tables:
+        return [], 1
+    table = snapshot.tables[name]
+    return summary_table.page(table, snapshot.partitions[table.partition], page_current, page_size, sort_by, filter_query)
 
 @app.callback(
     Output('comparison-chart', 'figure'),
     [Input('sector-selector', 'value'),
      Input('metric-selector', 'value'),
      Input('timeframe-selector', 'value'),
-     Input('compare-indexes', 'value')]
+     Input('compare-indexes', 'value'),
+     Input('sector-aggregate', 'value')]
 )
-def update_chart(selected_sectors, selected_metric, selected_timeframe, compare_indexes):
-    # Select data for the chosen sectors
-    filtered_dfs = []
-    overall_metrics = {}
-    for sector in selected_sectors:
-        if sector == 'Hardware':
-            filtered_dfs.append(hardware_metrics)
-            overall_metrics['Hardware Overall'] = hardware_metrics.mean()
-        elif sector == 'Software':
-            filtered_dfs.append(software_metrics)
-            overall_metrics['Software Overall'] = software_metrics.mean()
-        elif sector == 'Digital Media':
-            filtered_dfs.append(digital_media_metrics)
-            overall_metrics['Digital Media Overall'] = digital_media_metrics.mean()
-    
-    filtered_df = pd.concat(filtered_dfs)
-    
-    # Add overall metrics if specific sectors are selected
-    if 'Hardware' in selected_sectors:
-        filtered_df = pd.concat([filtered_df, pd.DataFrame(overall_metrics['Hardware Overall'], columns=['Hardware Overall']).T])
-    if 'Software' in selected_sectors:
-        filtered_df = pd.concat([filtered_df, pd.DataFrame(overall_metrics['Software Overall'], columns=['Software Overall']).T])
-    if 'Digital Media' in selected_sectors:
-        filtered_df = pd.concat([filtered_df, pd.DataFrame(overall_metrics['Digital Media Overall'], columns=['Digital Media Overall']).T])
-
-    # Add S&P 500 and NASDAQ indices for comparison (if selected)
-    if compare_indexes:
-        for index in compare_indexes:
-            filtered_df = pd.concat([filtered_df, index_metrics.loc[[index]]])
-
-    # Convert metric to numeric for plotting
-    filtered_df[selected_metric] = pd.to_numeric(filtered_df[selected_metric], errors='coerce')
-    filtered_df = filtered_df.dropna(subset=[selected_metric])
+def update_chart(selected_sectors, selected_metric, selected_timeframe, compare_indexes, selected_aggregate='mean'):
+    frames = refresh.current().frames
+
+    # Everything is precomputed per (sector, ticker); price metrics have a column per timeframe
+    column = (selected_metric, selected_timeframe if selected_metric in rollups.PRICE_METRICS else '')
+    metric = frames['sector_metrics'][column]
+    aggregates = frames['sector_aggregates'][column].xs(selected_aggregate, level='aggregate')
+
+    # Tickers of the chosen sectors, one aggregate row per sector, then the selected indexes
+    values = pd.concat([
+        metric.loc[selected_sectors].droplevel('sector'),
+        aggregates.loc[selected_sectors].rename(lambda sector: f'{sector} Overall'),
+        metric.loc['Index'].loc[compare_indexes or []],
+    ])
+    filtered_df = values.rename(selected_metric).dropna().to_frame()
 
     # Create comparison chart based on the selected metric
     comparison_fig = px.bar(
@@ -341,40 +307,118 @@ def update_chart(selected_sectors, selected_metric, selected_timeframe, compare_
         template='plotly_dark'  # تم جدید با رنگ تیره اما روشن‌تر
     )
 
-    return comparison_fig
+    return figures.compact(comparison_fig)
+
+
+def line_series(prices, selected_companies, comparison_company):
+    """(name, prices, visible) of every line the chart draws, in trace order; prices has one column per company.
+
+    visible says whether the line shows with 'Aggregate Growth' on and off.
+    Both sets of lines are sent, so the aggregateLines clientside callback
+    switches between them in the browser.
+    """
+    aggregated = len(selected_companies) > 2
+    lines = []
+    if aggregated:
+        top_companies_subset = [comp for comp in selected_companies if comp != comparison_company]
+        lines.append(('Average of Selected', prices[top_companies_subset].mean(axis=1),
+                      {'aggregate': True, 'companies': False}))
+    for i, company in enumerate(selected_companies):
+        # Aggregated, the average is compared with comparison_company; with two companies or fewer, the first shows alone
+        lines.append((company, prices[company],
+                      {'aggregate': company == comparison_company if aggregated else i == 0, 'companies': True}))
+    if aggregated and comparison_company and comparison_company not in selected_companies:
+        lines.append((comparison_company, prices[comparison_company], {'aggregate': True, 'companies': False}))
+    return lines
 
+@app.callback(
+    [Output('live', 'data'),
+     Output('live-interval', 'disabled')],
+    Input('live-toggle', 'value'),
+    State('live', 'data')
+)
+def toggle_live(live_toggle, live_state):
+    live_state = live.session_state('live' in (live_toggle or []), live_state)
+    return live_state, not live_state['enabled']
 
 # Callback to update the line chart based on company selection, aggregation option, and comparison company
 @app.callback(
     Output('line-chart', 'figure'),
     [Input('line-chart-company-selector', 'value'),
-     Input('line-chart-aggregate-selector', 'value'),
-     Input('line-chart-comparison-selector', 'value')]
+     State('line-chart-aggregate-selector', 'value'),
+     Input('line-chart-comparison-selector', 'value'),
+     Input('line-chart', 'relayoutData'),
+     Input('live', 'data')]
 )
-def update_line_chart(selected_companies, aggregate_option, comparison_company):
+def update_line_chart(selected_companies, aggregate_option, comparison_company, relayout_data=None, live_state=None):
     if not selected_companies:
+        live.forget(live_state, ['line-chart'])
         return {}
 
-    fig = go.Figure()
+    top_companies_data = refresh.current().frames['top_companies_data']
+    if live.is_live(live_state):
+        # Every company's price followed by its live bars so far
+        bars = live.draw(live_state, ['line-chart'],
+                         {company: (company, top_companies_data[[company]].set_axis(['Close'], axis=1))
+                          for company in top_companies_data.columns})
+        top_companies_data = pd.concat([top_companies_data,
+                                        pd.DataFrame({company: b['Close'] for company, b in bars.items()})])
+    else:
+        live.forget(live_state, ['line-chart'])
 
-    if 'aggregate' in aggregate_option:
-        if len(selected_companies) > 2:
-            top_companies_subset = [comp for comp in selected_companies if comp != comparison_company]
-            avg_prices = top_companies_data[top_companies_subset].mean(axis=1)
-            fig.add_trace(go.Scatter(x=top_companies_data.index, y=avg_prices, mode='lines', name='Average of Selected'))
+    # Only the zoomed-in window is sent, downsampled to the chart's resolution
+    top_companies_data = downsample.window(top_companies_data, relayout_data)
+    fig = go.Figure()
 
-            if comparison_company:
-                fig.add_trace(go.Scatter(x=top_companies_data.index, y=top_companies_data[comparison_company], mode='lines', name=comparison_company))
-        else:
-            fig.add_trace(go.Scatter(x=top_companies_data.index, y=top_companies_data[selected_companies[0]], mode='lines', name='Selected Company'))
-    else:
-        for company in selected_companies:
-            fig.add_trace(go.Scatter(x=top_companies_data.index, y=top_companies_data[company], mode='lines', name=company))
+    mode = 'aggregate' if 'aggregate' in (aggregate_option or []) else 'companies'
+    for name, prices, visible in line_series(top_companies_data, selected_companies, comparison_company):
+        prices = downsample.downsample_series(prices)
+        fig.add_trace(figures.scatter(x=prices.index, y=prices, mode='lines', name=name,
+                                      visible=visible[mode], meta=visible))
 
     fig.update_layout(title='5-Year Growth of Top Companies', xaxis_title='Date', yaxis_title='Stock Price',
-                      plot_bgcolor='#2E2E2E', paper_bgcolor='#2E2E2E', font_color='white')
+                      plot_bgcolor='#2E2E2E', paper_bgcolor='#2E2E2E', font_color='white',
+                      # Keep the user's zoom when the re-queried figure arrives
+                      uirevision='line-chart')
+
+    return figures.compact(fig, extendable=live.is_live(live_state))
+
+# The aggregate toggle only switches between lines the browser already has (assets/clientside.js)
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='aggregateLines'),
+    Output('line-chart', 'figure', allow_duplicate=True),
+    Input('line-chart-aggregate-selector', 'value'),
+    State('line-chart', 'figure'),
+    prevent_initial_call=True
+)
 
-    return fig
+# Live mode: append the bars after this session's cursor to every line, shown or not
+@app.callback(
+    Output('line-chart', 'extendData'),
+    Input('live-interval', 'n_intervals'),
+    [State('live', 'data'),
+     State('line-chart-company-selector', 'value'),
+     State('line-chart-comparison-selector', 'value')],
+    prevent_initial_call=True
+)
+def stream_line_chart(n_intervals, live_state, selected_companies, comparison_company):
+    if not selected_companies:
+        return dash.no_update
+
+    def extend(bars, kernels):
+        closes = pd.DataFrame({company: new['Close'] for company, new in bars.items()})
+        lines = line_series(closes, selected_companies, comparison_company)
+        return [{'x': [live.timestamps(prices.index) for _, prices, _ in lines],
+                 'y': [prices.tolist() for _, prices, _ in lines]}, list(range(len(lines)))]
+
+    update = live.poll(live_state, 'line-chart', extend)
+    return dash.no_update if update is None else update
+
+# Callback and provider timings, and the hit ratios of the fundamentals cache
+# and the Parquet store, on GET /metrics
+instrumentation.register_cache('fundamentals', lambda: (fundamentals.hits, fundamentals.misses))
+instrumentation.register_cache('store', lambda: (store.hits, store.misses))
+instrumentation.install(app)
 
 if __name__ == '__main__':
     app.run_server(debug=True)
@@ -1,47 +1,74 @@
 
-import yfinance as yf
+import os
 import time
+import functools
+import numpy as np
 import pandas as pd
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
-from dash.dependencies import Input, Output, State
+from dash.dependencies import ClientsideFunction, Input, Output, State
 import plotly.express as px
 import plotly.graph_objs as go
 from dash import dcc, html
 from datetime import datetime, timedelta
+import basket
+import downsample
+import figures
+import fundamentals
+import indicators
+import instrumentation
+import live
+import providers
+import store
+from range_cache import RangeCache
+from shared_cache import SharedCache, single_flight
 
 # Assume data is your DataFrame
-app = dash.Dash(__name__)
+# Callback responses and assets are gzip/brotli compressed (flask-compress)
+app = dash.Dash(__name__, compress=True)
+
+# WSGI entry point for gunicorn (gunicorn app2:server)
+server = app.server
 
 symbols = ['AAPL', 'MSFT', 'NVDA', 'GOOGL', 'AMZN']
 
+# Baskets offered next to the single symbols: name -> (constituents, weights),
+# where weights is 'equal', 'market_cap' or {symbol: weight}
+baskets = {
+    'TOTAL': (symbols, os.environ.get('TOTAL_WEIGHTING', 'equal')),
+}
+
+# Processed datasets kept per worker (symbol and date range each)
+DATASET_CACHE_SIZE = 32
+
+def _fetch_history(symbol, start_date, end_date, interval):
+    # One worker at a time tops a symbol up; the others then find it fresh in the store
+    with single_flight('history', (providers.get_provider().name, symbol, interval)):
+        return store.history(symbol, start=start_date, end=end_date, interval=interval)
+
+# Sub-ranges of anything already fetched are served from memory
+history_cache = RangeCache(_fetch_history)
+
 def fetch_data(symbol, start_date, end_date):
     try:
-        ticker = yf.Ticker(symbol)
-        data = ticker.history(start=start_date, end=end_date)
-        return data
+        return history_cache.get(symbol, start_date, end_date)
     except Exception as e:
         print(f"Error fetching data: {e}")
         return pd.DataFrame()
 
+# Indicators are memoized per dataset and parameters (see indicators.py)
 def compute_RSI(data, window=14):
-    delta = data['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
+    return indicators.rsi(data['Close'], window)
 
 def compute_MACD(data, fast=12, slow=26, signal=9):
-    ema_fast = data['Close'].ewm(span=fast, adjust=False).mean()
-    ema_slow = data['Close'].ewm(span=slow, adjust=False).mean()
-    macd = ema_fast - ema_slow
-    signal_line = macd.ewm(span=signal, adjust=False).mean()
-    histogram = macd - signal_line
-    return macd, signal_line, histogram
+    return indicators.macd(data['Close'], fast, slow, signal)
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
 def process_data(data):
-    data["Day_of_week"] = data.index.day_name()
+    # Calendar features as categorical codes rather than one string per row
+    data["Day_of_week"] = pd.Categorical.from_codes(data.index.dayofweek, categories=DAY_NAMES, ordered=True)
     data["Month"] = data.index.month
     data["Quarter"] = data.index.quarter
     data["Volume_category"] = pd.cut(data["Volume"], bins=[0, 6e7, 9e7, float('inf')], labels=["Low", "Medium", "High"])
@@ -49,11 +76,23 @@ def process_data(data):
     data['RSI'] = compute_RSI(data)
     data['rolling_mean_7'] = data['Close'].rolling(window=7).mean().fillna(0)
     data['rolling_std_7'] = data['Close'].rolling(window=7).std()
-    data['EMA_12'] = data['Close'].ewm(span=12, adjust=False).mean()
-    data['EMA_26'] = data['Close'].ewm(span=26, adjust=False).mean()
+    data['EMA_12'] = indicators.ema(data['Close'], 12)
+    data['EMA_26'] = indicators.ema(data['Close'], 26)
     data['MACD'], data['MACD_signal'], _ = compute_MACD(data)
     return data
 
+# Aggregations behind the categorical charts: each figure gets a handful of
+# cells instead of every row, however long the date range is
+def aggregate_trend_by_day(data):
+    return data.groupby(['Day_of_week', 'Market_trend'], observed=True).size().rename('Count').reset_index()
+
+def aggregate_volume_categories(data):
+    return data.groupby('Volume_category', observed=True).size().rename('Count').reset_index()
+
+def aggregate_volume_by_category_and_day(data):
+    volume = data.groupby(['Volume_category', 'Day_of_week'], observed=True)['Volume'].sum().reset_index()
+    return volume.astype({'Volume_category': str, 'Day_of_week': str})
+
 # Define color scheme
 colors = {
     'background': '#1E1E1E',
@@ -66,17 +105,14 @@ colors = {
     'info': '#17A2B8'
 }
 
+# Provider timings on GET /metrics include the startup fetches below
+instrumentation.instrument_provider()
+
 # Fetch company names
-company_names = {}
-for symbol in symbols:
-    try:
-        ticker = yf.Ticker(symbol)
-        company_names[symbol] = ticker.info['longName']
-    except:
-        company_names[symbol] = symbol
+company_names = {symbol: row['Name'] or symbol for symbol, row in fundamentals.fetch_rows(symbols).items()}
 
 dropdown_options = [{'label': f"{symbol}", 'value': symbol} for symbol in symbols]
-dropdown_options.append({'label': 'Total', 'value': 'TOTAL'})
+dropdown_options += [{'label': name.title(), 'value': name} for name in baskets]
 
 app.layout = html.Div(style={'backgroundColor': colors['background'], 'color': colors['text'], 'fontFamily': 'Arial, sans-serif'}, children=[
     html.Div([
@@ -162,8 +198,22 @@ app.layout = html.Div(style={'backgroundColor': colors['background'], 'color': c
                     dcc.Slider(id='macd-height', min=100, max=400, step=50, value=300, marks={i: str(i) for i in range(100, 401, 100)})
                 ]),
             ], style={'padding': '15px', 'backgroundColor': colors['secondary'], 'borderRadius': '10px', 'marginBottom': '15px'}),
+            html.Div([
+                html.Label("Live Updates:", style={'marginBottom': '10px', 'fontWeight': 'bold'}),
+                dcc.Checklist(
+                    id='live-toggle',
+                    options=[{'label': 'Stream new bars', 'value': 'live'}],
+                    value=[],
+                    style={'color': colors['text']}
+                ),
+            ], style={'padding': '15px', 'backgroundColor': colors['secondary'], 'borderRadius': '10px', 'marginBottom': '15px'}),
         ], style={'width': '250px', 'float': 'left', 'padding': '20px', 'backgroundColor': colors['background'], 'borderRadius': '10px', 'marginRight': '20px'}),
         html.Div([
+            # Key of the server-side dataset the figures below are drawn from
+            dcc.Store(id='dataset'),
+            # Live mode: this page's session id and whether it is on; the interval polls for new bars
+            dcc.Store(id='live'),
+            dcc.Interval(id='live-interval', interval=live.INTERVAL_MS, disabled=True),
             dcc.Graph(id='candlestick-chart'),
             html.Div([
                 dcc.Graph(id='rsi-chart')
@@ -185,87 +235,160 @@ app.layout = html.Div(style={'backgroundColor': colors['background'], 'color': c
     ])
 ])
 
+# Common x-axis configuration for all charts
+xaxis_config = dict(
+    rangebreaks=[dict(bounds=["sat", "mon"])],
+    rangeslider_visible=False,
+    rangeselector=dict(
+        buttons=list([
+            dict(count=1, label="1m", step="month", stepmode="backward"),
+            dict(count=6, label="6m", step="month", stepmode="backward"),
+            dict(count=1, label="YTD", step="year", stepmode="todate"),
+            dict(count=1, label="1y", step="year", stepmode="backward"),
+            dict(step="all")
+        ]),
+        bgcolor=colors['secondary'],
+        activecolor=colors['primary'],
+        font=dict(color=colors['text'])
+    )
+)
+
+# Processed datasets, kept server-side and keyed by symbol and range. The
+# browser only holds the key (in the 'dataset' store), and every figure callback
+# looks the data up here, so inputs that do not change the data never refetch
+# or reprocess it. Each worker keeps its copies for at most one shared-cache
+# max_age window; a worker without a current copy reads it from the cache
+# shared by every worker on the host, where only the first worker to miss it
+# builds it while the others wait (see shared_cache.py).
+datasets = SharedCache('datasets')
+
+@functools.lru_cache(maxsize=DATASET_CACHE_SIZE)
+def load_dataset(symbol, start_date, end_date, window):
+    # window is the shared cache's max_age period the call falls in, so a
+    # worker's copy is dropped as often as the shared entry is recomputed
+    return datasets.get((providers.get_provider().name, symbol, start_date, end_date),
+                        lambda: build_dataset(symbol, start_date, end_date))
+
+def build_dataset(symbol, start_date, end_date):
+    start_date = pd.to_datetime(start_date)
+    end_date = pd.to_datetime(end_date)
+
+    if symbol in baskets:
+        constituents, weights = baskets[symbol]
+        data = basket.aggregate(constituents, start_date, end_date, fetch_data, weights)
+    else:
+        data = fetch_data(symbol, start_date, end_date)
+
+    if data.empty:
+        raise ValueError("No data available for the selected date range")
+
+    return process_data(data)
+
+def get_dataset(key):
+    return load_dataset(key['symbol'], key['start_date'], key['end_date'], int(time.time() // datasets.max_age))
+
 @app.callback(
-    [Output('candlestick-chart', 'figure'),
-     Output('rsi-chart', 'figure'),
-     Output('macd-chart', 'figure'),
-     Output('rsi-container', 'style'),
-     Output('macd-container', 'style'),
-     Output('bar-chart', 'figure'),
-     Output('3d-plot', 'figure'),
-     Output('histogram', 'figure'),
-     Output('pie-chart', 'figure'),
-     Output('treemap', 'figure')],
+    Output('dataset', 'data'),
     [Input('symbol-dropdown', 'value'),
      Input('date-picker-range', 'start_date'),
-     Input('date-picker-range', 'end_date'),
+     Input('date-picker-range', 'end_date')]
+)
+def select_dataset(symbol, start_date, end_date):
+    if not symbol or not start_date or not end_date:
+        return dash.no_update
+
+    key = {'symbol': symbol, 'start_date': str(start_date)[:10], 'end_date': str(end_date)[:10]}
+    try:
+        get_dataset(key)
+    except Exception as e:
+        print(f"Error in select_dataset: {e}")
+        return dash.no_update
+    return key
+
+@app.callback(
+    [Output('live', 'data'),
+     Output('live-interval', 'disabled')],
+    Input('live-toggle', 'value'),
+    State('live', 'data')
+)
+def toggle_live(live_toggle, live_state):
+    live_state = live.session_state('live' in (live_toggle or []), live_state)
+    return live_state, not live_state['enabled']
+
+# dcc.Graph never clears relayoutData when a new figure arrives, so a zoom made
+# on one dataset would cut the next one to its range. A new dataset clears it
+# first (update_candlestick waits for this callback) and is drawn in full.
+@app.callback(Output('candlestick-chart', 'relayoutData'), Input('dataset', 'data'))
+def reset_zoom(key):
+    return None
+
+def live_dataset(key, live_state, graphs):
+    """The dataset, followed by the live bars so far when live mode is on (cursors recorded for graphs)."""
+    data = get_dataset(key)
+    if not live.is_live(live_state):
+        live.forget(live_state, graphs)
+        return data
+    bars = live.draw(live_state, graphs, {'price': (key['symbol'], data)})['price']
+    return live.append(data, bars)
+
+@app.callback(
+    Output('candlestick-chart', 'figure'),
+    [Input('dataset', 'data'),
      Input('indicator-checklist', 'value'),
      Input('ema-fast', 'value'),
      Input('ema-slow', 'value'),
-     Input('rsi-period', 'value'),
-     Input('macd-fast', 'value'),
-     Input('macd-slow', 'value'),
-     Input('macd-signal', 'value'),
-     Input('candlestick-height', 'value'),
-     Input('rsi-height', 'value'),
-     Input('macd-height', 'value')]
+     Input('candlestick-chart', 'relayoutData'),
+     Input('live', 'data')],
+    [State('candlestick-height', 'value')]
 )
-def update_charts(symbol, start_date, end_date, selected_indicators, ema_fast, ema_slow, rsi_period, 
-                  macd_fast, macd_slow, macd_signal, candlestick_height, rsi_height, macd_height):
-    if not symbol or not start_date or not end_date:
+def update_candlestick(key, selected_indicators, ema_fast, ema_slow, relayout_data, live_state, candlestick_height):
+    if not key:
         return dash.no_update
 
     try:
-        start_date = pd.to_datetime(start_date)
-        end_date = pd.to_datetime(end_date)
-
-        if symbol == 'TOTAL':
-            data = pd.DataFrame()
-            for s in symbols:
-                stock_data = fetch_data(s, start_date, end_date)
-                if data.empty:
-                    data = stock_data
-                else:
-                    data = data.add(stock_data, fill_value=0)
-            data = data.div(len(symbols))  # Average of all stocks
-        else:
-            data = fetch_data(symbol, start_date, end_date)
-
-        if data.empty:
-            raise ValueError("No data available for the selected date range")
-
-        data = process_data(data)
+        # The candlestick and the traces over it take different attributes, so each gets its own extendData
+        data = live_dataset(key, live_state, ['candlestick-chart', 'candlestick-overlays'])
+        symbol = key['symbol']
+        # Only the zoomed-in window is sent, merged into as many bars as the chart can show
+        bars = downsample.downsample_ohlc(downsample.window(data, relayout_data))
 
         # Candlestick chart
         fig = go.Figure(data=[go.Candlestick(
-            x=data.index,
-            open=data['Open'],
-            high=data['High'],
-            low=data['Low'],
-            close=data['Close'],
+            x=bars.index,
+            open=bars['Open'],
+            high=bars['High'],
+            low=bars['Low'],
+            close=bars['Close'],
             increasing_line_color=colors['success'],
             decreasing_line_color=colors['danger'],
             name='Price'
         )])
 
-        # Improved volume bars
-        colors_volume = [colors['danger'] if data['Close'][i] < data['Open'][i] else colors['success'] for i in range(len(data))]
-        fig.add_trace(go.Bar(
-            x=data.index,
-            y=data['Volume'],
-            name='Volume',
-            marker_color=colors_volume,
-            opacity=0.3,
-            yaxis='y2'
-        ))
+        # Improved volume bars: rising and falling bars are separate traces, so live
+        # bars extend them with x and y alone instead of a per-bar color array
+        rising = (bars['Close'] >= bars['Open']).to_numpy()
+        for mask, color, showlegend in ((rising, colors['success'], True), (~rising, colors['danger'], False)):
+            fig.add_trace(go.Bar(
+                x=bars.index[mask],
+                y=bars['Volume'][mask],
+                name='Volume',
+                marker_color=color,
+                opacity=0.3,
+                yaxis='y2',
+                legendgroup='volume',
+                showlegend=showlegend
+            ))
 
         if 'EMA' in selected_indicators:
-            ema_fast_line = data['Close'].ewm(span=ema_fast, adjust=False).mean()
-            ema_slow_line = data['Close'].ewm(span=ema_slow, adjust=False).mean()
-            fig.add_trace(go.Scatter(x=data.index, y=ema_fast_line, mode='lines', name=f'EMA {ema_fast}', line=dict(color=colors['primary'])))
-            fig.add_trace(go.Scatter(x=data.index, y=ema_slow_line, mode='lines', name=f'EMA {ema_slow}', line=dict(color=colors['warning'])))
-
-        title = f'{symbol} - {company_names.get(symbol, "Total")}' if symbol != 'TOTAL' else 'Total of Selected Stocks'
+            # Computed over the whole dataset, then cut to the same window
+            ema_fast_line = downsample.downsample_series(downsample.window(indicators.ema(data['Close'], ema_fast), relayout_data))
+            ema_slow_line = downsample.downsample_series(downsample.window(indicators.ema(data['Close'], ema_slow), relayout_data))
+            fig.add_trace(figures.scatter(x=ema_fast_line.index, y=ema_fast_line, webgl=False, mode='lines', name=f'EMA {ema_fast}', line=dict(color=colors['primary'])))
+            fig.add_trace(figures.scatter(x=ema_slow_line.index, y=ema_slow_line, webgl=False, mode='lines', name=f'EMA {ema_slow}', line=dict(color=colors['warning'])))
+            live.keep(live_state, 'candlestick-overlays', data,
+                      ema_fast=indicators.EMA(span=ema_fast), ema_slow=indicators.EMA(span=ema_slow))
+
+        title = f'{symbol} - {company_names.get(symbol, "Total")}' if symbol not in baskets else 'Total of Selected Stocks'
         fig.update_layout(
             title=dict(
                 text=title,
@@ -276,98 +399,253 @@ def update_charts(symbol, start_date, end_date, selected_indicators, ema_fast, e
             ),
             yaxis_title='Price',
             yaxis2=dict(title='Volume', overlaying='y', side='right', showgrid=False),
+            barmode='overlay',
             xaxis_rangeslider_visible=False,
             template='plotly_dark',
             height=candlestick_height,
             margin=dict(t=100),
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            # Keep the user's zoom when the re-queried figure arrives, until the dataset changes
+            uirevision=f"{symbol} {key['start_date']} {key['end_date']}"
         )
-                         
-        # Common x-axis configuration for all charts
-        xaxis_config = dict(
-            rangebreaks=[dict(bounds=["sat", "mon"])],
-            rangeslider_visible=False,
-            rangeselector=dict(
-                buttons=list([
-                    dict(count=1, label="1m", step="month", stepmode="backward"),
-                    dict(count=6, label="6m", step="month", stepmode="backward"),
-                    dict(count=1, label="YTD", step="year", stepmode="todate"),
-                    dict(count=1, label="1y", step="year", stepmode="backward"),
-                    dict(step="all")
-                ]),
-                bgcolor=colors['secondary'],
-                activecolor=colors['primary'],
-                font=dict(color=colors['text'])
-            )
+        fig.update_xaxes(**xaxis_config)
+        return figures.compact(fig, extendable=live.is_live(live_state))
+
+    except Exception as e:
+        print(f"Error in update_candlestick: {e}")
+        return dash.no_update
+
+@app.callback(
+    Output('rsi-chart', 'figure'),
+    [Input('dataset', 'data'),
+     Input('indicator-checklist', 'value'),
+     Input('rsi-period', 'value'),
+     Input('live', 'data')],
+    [State('rsi-height', 'value')]
+)
+def update_rsi(key, selected_indicators, rsi_period, live_state, rsi_height):
+    if not key:
+        return dash.no_update
+
+    # RSI chart
+    rsi_fig = go.Figure()
+    if 'RSI' not in selected_indicators:
+        live.forget(live_state, ['rsi-chart'])
+        return figures.compact(rsi_fig)
+
+    try:
+        data = live_dataset(key, live_state, ['rsi-chart'])
+        rsi = compute_RSI(data, window=rsi_period)
+        live.keep(live_state, 'rsi-chart', data, rsi=indicators.RSI(rsi_period))
+        rsi_fig.add_trace(figures.scatter(x=data.index, y=rsi, webgl=False, mode='lines', name='RSI', line=dict(color=colors['info'])))
+        rsi_fig.add_hline(y=70, line_dash="dash", line_color=colors['danger'], annotation_text="Overbought")
+        rsi_fig.add_hline(y=30, line_dash="dash", line_color=colors['success'], annotation_text="Oversold")
+        rsi_fig.update_layout(
+            title='RSI',
+            yaxis_title='RSI Value',
+            template='plotly_dark',
+            height=rsi_height,
+            margin=dict(l=50, r=50, t=85, b=50)
         )
+        rsi_fig.update_xaxes(**xaxis_config)
+        return figures.compact(rsi_fig, extendable=live.is_live(live_state))
 
-        fig.update_xaxes(**xaxis_config)
+    except Exception as e:
+        print(f"Error in update_rsi: {e}")
+        return dash.no_update
+
+@app.callback(
+    Output('macd-chart', 'figure'),
+    [Input('dataset', 'data'),
+     Input('indicator-checklist', 'value'),
+     Input('macd-fast', 'value'),
+     Input('macd-slow', 'value'),
+     Input('macd-signal', 'value'),
+     Input('live', 'data')],
+    [State('macd-height', 'value')]
+)
+def update_macd(key, selected_indicators, macd_fast, macd_slow, macd_signal, live_state, macd_height):
+    if not key:
+        return dash.no_update
+
+    # MACD chart
+    macd_fig = go.Figure()
+    if 'MACD' not in selected_indicators:
+        live.forget(live_state, ['macd-chart'])
+        return figures.compact(macd_fig)
+
+    try:
+        data = live_dataset(key, live_state, ['macd-chart'])
+        macd, signal, histogram = compute_MACD(data, fast=macd_fast, slow=macd_slow, signal=macd_signal)
+        live.keep(live_state, 'macd-chart', data, macd=indicators.MACD(macd_fast, macd_slow, macd_signal))
+        macd_fig.add_trace(figures.scatter(x=data.index, y=macd, webgl=False, mode='lines', name='MACD', line=dict(color=colors['primary'])))
+        macd_fig.add_trace(figures.scatter(x=data.index, y=signal, webgl=False, mode='lines', name='Signal', line=dict(color=colors['warning'])))
+        macd_fig.add_trace(go.Bar(x=data.index, y=histogram, name='Histogram', marker_color=colors['success']))
+        macd_fig.update_layout(
+            title='MACD',
+            yaxis_title='MACD Value',
+            template='plotly_dark',
+            height=macd_height,
+            margin=dict(l=50, r=50, t=85, b=50)
+        )
+        macd_fig.update_xaxes(**xaxis_config)
+        return figures.compact(macd_fig, extendable=live.is_live(live_state))
+
+    except Exception as e:
+        print(f"Error in update_macd: {e}")
+        return dash.no_update
+
+# Layout-only inputs are applied in the browser (assets/clientside.js): the
+# figure already drawn gets its new height without a round-trip to the server
+for graph, slider in (('candlestick-chart', 'candlestick-height'), ('rsi-chart', 'rsi-height'),
+                      ('macd-chart', 'macd-height')):
+    app.clientside_callback(
+        ClientsideFunction(namespace='dashboard', function_name='resize'),
+        Output(graph, 'figure', allow_duplicate=True),
+        Input(slider, 'value'),
+        State(graph, 'figure'),
+        prevent_initial_call=True
+    )
+
+# Live mode: each poll appends the bars after every graph's cursor, with the
+# indicator values at those bars, instead of redrawing the figures
+@app.callback(
+    [Output('candlestick-chart', 'extendData'),
+     Output('rsi-chart', 'extendData'),
+     Output('macd-chart', 'extendData')],
+    Input('live-interval', 'n_intervals'),
+    [State('live', 'data'),
+     State('dataset', 'data')],
+    prevent_initial_call=True
+)
+def stream_bars(n_intervals, live_state, key):
+    # Indicators for the new bars come from the kernels each graph was drawn with (see live.keep)
+    def candlestick(bars, kernels):
+        new = bars['price']
+        return [{'x': [live.timestamps(new.index)], 'open': [new['Open'].tolist()], 'high': [new['High'].tolist()],
+                 'low': [new['Low'].tolist()], 'close': [new['Close'].tolist()]}, [0]]
+
+    def rsi(bars, kernels):
+        new = bars['price']
+        return [{'x': [live.timestamps(new.index)], 'y': [kernels['rsi'].update(new['Close']).tolist()]}, [0]]
+
+    def macd(bars, kernels):
+        new = bars['price']
+        lines = kernels['macd'].update(new['Close'])
+        return [{'x': [live.timestamps(new.index)] * 3, 'y': [line.tolist() for line in lines]}, [0, 1, 2]]
+
+    updates = []
+    for graph, extend in (('candlestick-chart', candlestick), ('rsi-chart', rsi), ('macd-chart', macd)):
+        update = live.poll(live_state, graph, extend) if key else None
+        updates.append(dash.no_update if update is None else update)
+    return updates
 
-        # RSI chart
-        rsi_fig = go.Figure()
-        if 'RSI' in selected_indicators:
-            rsi = compute_RSI(data, window=rsi_period)
-            rsi_fig.add_trace(go.Scatter(x=data.index, y=rsi, mode='lines', name='RSI', line=dict(color=colors['info'])))
-            rsi_fig.add_hline(y=70, line_dash="dash", line_color=colors['danger'], annotation_text="Overbought")
-            rsi_fig.add_hline(y=30, line_dash="dash", line_color=colors['success'], annotation_text="Oversold")
-            rsi_fig.update_layout(
-                title='RSI',
-                yaxis_title='RSI Value',
-                template='plotly_dark',
-                height=rsi_height,
-                margin=dict(l=50, r=50, t=85, b=50)
-            )
-            rsi_fig.update_xaxes(**xaxis_config)
-
-        # MACD chart
-        macd_fig = go.Figure()
-        if 'MACD' in selected_indicators:
-            macd, signal, histogram = compute_MACD(data, fast=macd_fast, slow=macd_slow, signal=macd_signal)
-            macd_fig.add_trace(go.Scatter(x=data.index, y=macd, mode='lines', name='MACD', line=dict(color=colors['primary'])))
-            macd_fig.add_trace(go.Scatter(x=data.index, y=signal, mode='lines', name='Signal', line=dict(color=colors['warning'])))
-            macd_fig.add_trace(go.Bar(x=data.index, y=histogram, name='Histogram', marker_color=colors['success']))
-            macd_fig.update_layout(
-                title='MACD',
-                yaxis_title='MACD Value',
-                template='plotly_dark',
-                height=macd_height,
-                margin=dict(l=50, r=50, t=85, b=50)
-            )
-            macd_fig.update_xaxes(**xaxis_config)
-
-        rsi_style = {'display': 'block'} if 'RSI' in selected_indicators else {'display': 'none'}
-        macd_style = {'display': 'block'} if 'MACD' in selected_indicators else {'display': 'none'}
-
-        # Bar Chart - Market Trend by Day of Week
-        bar_fig = px.bar(data, x='Day_of_week', color='Market_trend',
-                         title="Market Trend by Day of the Week",
-                         template='plotly_dark')
-
-        # 3D Plot - RSI vs MACD vs Close
-        scatter_3d_fig = px.scatter_3d(data, x='RSI', y='MACD', z='Close', color='Market_trend',
-                                       title='3D Plot of RSI vs MACD vs Close',
-                                       template='plotly_dark')
-
-        # Histogram - Rolling Standard Deviation
-        histogram_fig = px.histogram(data, x='rolling_std_7', 
-                                     title="Distribution of Rolling Standard Deviation",
-                                     template='plotly_dark')
-
-        # Pie Chart - Volume Category Distribution
-        pie_fig = px.pie(data, names='Volume_category', 
-                         title="Volume Category Distribution",
-                         template='plotly_dark')
-
-        # Treemap - Volume by Day of Week and Category
-        treemap_fig = px.treemap(data, path=['Volume_category', 'Day_of_week'], values='Volume',
-                                 title="Treemap of Volume by Category and Day of Week",
-                                 template='plotly_dark')
-
-        return fig, rsi_fig, macd_fig, rsi_style, macd_style, bar_fig, scatter_3d_fig, histogram_fig, pie_fig, treemap_fig
+@app.callback(
+    Output('candlestick-chart', 'extendData', allow_duplicate=True),
+    Input('live-interval', 'n_intervals'),
+    [State('live', 'data'),
+     State('dataset', 'data')],
+    prevent_initial_call=True
+)
+def stream_overlays(n_intervals, live_state, key):
+    # Volume bars (rising, falling) and the EMA lines, if drawn: traces 1 onwards of the candlestick chart
+    def extend(bars, kernels):
+        new = bars['price']
+        rising = (new['Close'] >= new['Open']).to_numpy()
+        x = np.array(live.timestamps(new.index), dtype=object)
+        update = {'x': [x[rising].tolist(), x[~rising].tolist()],
+                  'y': [new['Volume'][rising].tolist(), new['Volume'][~rising].tolist()]}
+        for name in ('ema_fast', 'ema_slow'):
+            if name in kernels:
+                update['x'].append(x.tolist())
+                update['y'].append(kernels[name].update(new['Close']).tolist())
+        return [update, list(range(1, len(update['x']) + 1))]
+
+    update = live.poll(live_state, 'candlestick-overlays', extend) if key else None
+    return dash.no_update if update is None else update
+
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='indicatorVisibility'),
+    [Output('rsi-container', 'style'),
+     Output('macd-container', 'style')],
+    Input('indicator-checklist', 'value')
+)
+
+# Bar Chart - Market Trend by Day of Week
+@app.callback(Output('bar-chart', 'figure'), Input('dataset', 'data'))
+def update_bar_chart(key):
+    if not key:
+        return dash.no_update
+    try:
+        counts = aggregate_trend_by_day(get_dataset(key))
+        return figures.compact(px.bar(counts, x='Day_of_week', y='Count', color='Market_trend',
+                                      category_orders={'Day_of_week': DAY_NAMES},
+                                      title="Market Trend by Day of the Week",
+                                      template='plotly_dark'))
+    except Exception as e:
+        print(f"Error in update_bar_chart: {e}")
+        return dash.no_update
 
+# 3D Plot - RSI vs MACD vs Close
+@app.callback(Output('3d-plot', 'figure'), Input('dataset', 'data'))
+def update_3d_plot(key):
+    if not key:
+        return dash.no_update
+    try:
+        return figures.compact(figures.scatter_3d(get_dataset(key), x='RSI', y='MACD', z='Close', color='Market_trend',
+                                                  title='3D Plot of RSI vs MACD vs Close',
+                                                  template='plotly_dark'))
     except Exception as e:
-        print(f"Error in update_charts: {e}")
+        print(f"Error in update_3d_plot: {e}")
         return dash.no_update
 
+# Histogram - Rolling Standard Deviation
+@app.callback(Output('histogram', 'figure'), Input('dataset', 'data'))
+def update_histogram(key):
+    if not key:
+        return dash.no_update
+    try:
+        return figures.compact(px.histogram(get_dataset(key), x='rolling_std_7',
+                                            title="Distribution of Rolling Standard Deviation",
+                                            template='plotly_dark'))
+    except Exception as e:
+        print(f"Error in update_histogram: {e}")
+        return dash.no_update
+
+# Pie Chart - Volume Category Distribution
+@app.callback(Output('pie-chart', 'figure'), Input('dataset', 'data'))
+def update_pie_chart(key):
+    if not key:
+        return dash.no_update
+    try:
+        counts = aggregate_volume_categories(get_dataset(key))
+        return figures.compact(px.pie(counts, names='Volume_category', values='Count',
+                                      title="Volume Category Distribution",
+                                      template='plotly_dark'))
+    except Exception as e:
+        print(f"Error in update_pie_chart: {e}")
+        return dash.no_update
+
+# Treemap - Volume by Day of Week and Category
+@app.callback(Output('treemap', 'figure'), Input('dataset', 'data'))
+def update_treemap(key):
+    if not key:
+        return dash.no_update
+    try:
+        volume = aggregate_volume_by_category_and_day(get_dataset(key))
+        return figures.compact(px.treemap(volume, path=['Volume_category', 'Day_of_week'], values='Volume',
+                                          title="Treemap of Volume by Category and Day of Week",
+                                          template='plotly_dark'))
+    except Exception as e:
+        print(f"Error in update_treemap: {e}")
+        return dash.no_update
+
+# Callback and provider timings, and the hit ratios of the caches above, on GET /metrics
+instrumentation.register_cache('history', lambda: (history_cache.hits, history_cache.misses))
+instrumentation.register_cache('indicators', lambda: (indicators.hits, indicators.misses))
+instrumentation.register_cache('datasets', lambda: load_dataset.cache_info()[:2])
+instrumentation.register_cache('shared_datasets', lambda: (datasets.hits, datasets.misses))
+instrumentation.install(app)
+
 if __name__ == '__main__':
     app.run_server(debug=True, port=8080)
\ No newline at end of file
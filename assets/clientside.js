@@ -0,0 +1,38 @@
+// Clientside callbacks: presentation-only inputs (graph heights, which
+// indicator panels show, aggregated or per-company lines) are applied in the
+// browser to what it already holds, without a request to the server.
+// A figure is changed by a shallow copy, so its trace arrays, including any
+// bars appended in live mode, are kept.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dashboard: {
+        // The figure already drawn, at a new height
+        resize: function(height, figure) {
+            if (!figure || !figure.layout) {
+                return window.dash_clientside.no_update;
+            }
+            return Object.assign({}, figure, {layout: Object.assign({}, figure.layout, {height: height})});
+        },
+
+        // Display styles of the RSI and MACD containers
+        indicatorVisibility: function(selectedIndicators) {
+            var selected = selectedIndicators || [];
+            return [
+                {display: selected.indexOf('RSI') >= 0 ? 'block' : 'none'},
+                {display: selected.indexOf('MACD') >= 0 ? 'block' : 'none'}
+            ];
+        },
+
+        // Show the aggregated or the per-company lines; each trace's meta says
+        // whether it is visible in either mode (see app.line_series)
+        aggregateLines: function(aggregateOption, figure) {
+            if (!figure || !figure.data) {
+                return window.dash_clientside.no_update;
+            }
+            var mode = (aggregateOption || []).indexOf('aggregate') >= 0 ? 'aggregate' : 'companies';
+            var data = figure.data.map(function(trace) {
+                return trace.meta ? Object.assign({}, trace, {visible: trace.meta[mode]}) : trace;
+            });
+            return Object.assign({}, figure, {data: data});
+        }
+    }
+});
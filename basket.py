@@ -0,0 +1,60 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import fundamentals
+
+# Weighted baskets of symbols (app2's TOTAL, or any custom list). Constituents
+# are fetched concurrently, aligned on the union of their trading days with
+# prices carried forward, and averaged in one stacked array operation. Days
+# before a constituent's first bar are left out of the average rather than
+# counted as zero.
+
+CONCURRENCY = int(os.environ.get('BASKET_CONCURRENCY', 16))
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def fetch_all(symbols, fetch):
+    """{symbol: frame} fetched concurrently with fetch(symbol); failed or empty fetches are left out."""
+    with ThreadPoolExecutor(max_workers=max(1, min(CONCURRENCY, len(symbols)))) as pool:
+        frames = pool.map(fetch, symbols)
+        return {s: f for s, f in zip(symbols, frames) if f is not None and not f.empty}
+
+
+def fetch_constituents(symbols, start_date, end_date, fetch):
+    """{symbol: frame} fetched concurrently with fetch(symbol, start_date, end_date)."""
+    return fetch_all(symbols, lambda s: fetch(s, start_date, end_date))
+
+
+def resolve_weights(symbols, weights='equal'):
+    """Weights as an array aligned with symbols: 'equal', 'market_cap' or {symbol: weight}."""
+    if isinstance(weights, str):
+        if weights == 'equal':
+            return np.ones(len(symbols))
+        if weights == 'market_cap':
+            rows = fundamentals.fetch_rows(symbols)
+            return np.nan_to_num(np.array([rows[s]['Market Cap'] for s in symbols], dtype='float64'))
+        raise ValueError(f"Unknown basket weighting: {weights}")
+    return np.array([weights.get(s, 0.0) for s in symbols], dtype='float64')
+
+
+def combine(frames, weights):
+    """Weighted average of aligned constituent bars; weights has one entry per frame."""
+    symbols = list(frames)
+    aligned = pd.concat([frames[s][FIELDS] for s in symbols], axis=1, keys=symbols).sort_index().ffill()
+    # (days, symbols, fields)
+    values = aligned.to_numpy(dtype='float64').reshape(len(aligned), len(symbols), len(FIELDS))
+    w = np.asarray(weights, dtype='float64')[None, :, None] * ~np.isnan(values)
+    total = w.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        combined = np.nansum(values * w, axis=1) / total
+    return pd.DataFrame(combined, index=aligned.index, columns=FIELDS).dropna(subset=['Close'])
+
+
+def aggregate(symbols, start_date, end_date, fetch, weights='equal'):
+    frames = fetch_constituents(symbols, start_date, end_date, fetch)
+    if not frames:
+        return pd.DataFrame()
+    w = resolve_weights(list(frames), weights)
+    return combine(frames, w)
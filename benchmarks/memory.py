@@ -0,0 +1,85 @@
+"""Memory held per snapshot frame, per symbol and per symbol-year of history.
+
+    python benchmarks/memory.py                   # synthetic snapshot, 1,000 tickers
+    python benchmarks/memory.py --tickers 5000
+    python benchmarks/memory.py --live            # build_frames() with the configured provider
+
+Each frame is reported as served (dashboard_data.compact) and as float64,
+with its bytes per symbol and, for frames holding a history, per symbol per
+year of it. Every gunicorn worker maps the same published frames, so the
+served total is what one snapshot version costs, not what each worker adds.
+The rollup levels are only held by the process that builds the frames (the
+gunicorn master and the refresh.py publisher).
+"""
+import argparse
+import run
+import dashboard_data
+import synthetic
+
+# Frames spanning less than this hold a fixed window (all_data's last 5 bars), not a history
+HISTORY_DAYS = 30
+
+
+def frame_bytes(frame):
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+def symbols(frame):
+    """Tickers a frame holds: a 'Ticker' column level, a 'ticker' index level, or its columns."""
+    if 'Ticker' in (frame.columns.names or []):
+        return frame.columns.get_level_values('Ticker').nunique()
+    if 'ticker' in (frame.index.names or []):
+        return frame.index.get_level_values('ticker').nunique()
+    return len(frame.columns)
+
+
+def years(frame):
+    """Years of history in a date-indexed frame, or None."""
+    if not hasattr(frame.index, 'asi8') or len(frame.index) < 2:
+        return None
+    days = (frame.index.max() - frame.index.min()).days
+    return days / 365.25 if days >= HISTORY_DAYS else None
+
+
+def report(frames):
+    """(frame, dtype, shape, float64 bytes, bytes, bytes per symbol, bytes per symbol-year) rows."""
+    rows = []
+    for name, frame in frames.items():
+        served = frame_bytes(frame)
+        n, span = symbols(frame), years(frame)
+        rows.append((name, str(frame.dtypes.iloc[0]), frame.shape, frame_bytes(frame.astype('float64')), served,
+                     served / n if n else None, served / n / span if n and span else None))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=1_000)
+    parser.add_argument('--live', action='store_true', help='measure dashboard_data.build_frames() instead')
+    args = parser.parse_args(argv)
+
+    if args.live:
+        frames = dashboard_data.build_frames()
+        levels = dashboard_data.pyramid.levels
+    else:
+        frames = synthetic.frames(args.tickers)
+        equities = [s for s in synthetic.tickers(args.tickers) if not s.endswith('-USD')]
+        levels = synthetic.pyramid(equities + dashboard_data.index_tickers).levels
+    builder = {'rollup_' + level: bars for level, bars in levels.items() if bars is not None}
+
+    print(f"{'frame':<20} {'dtype':<8} {'shape':>14} {'float64':>10} {'served':>10} {'/symbol':>10} {'/symbol/yr':>11}")
+    totals = [0, 0]
+    for name, dtype, shape, wide, served, per_symbol, per_year in report(frames):
+        totals = [totals[0] + wide, totals[1] + served]
+        print(f"{name:<20} {dtype:<8} {f'{shape[0]}x{shape[1]}':>14} {run._size(wide):>10} {run._size(served):>10} "
+              f"{run._size(per_symbol):>10} {run._size(per_year):>11}")
+    print(f"{'total':<44} {run._size(totals[0]):>10} {run._size(totals[1]):>10}")
+
+    print('\nHeld by the builder only:')
+    for name, dtype, shape, wide, _, per_symbol, per_year in report(builder):
+        print(f"{name:<20} {dtype:<8} {f'{shape[0]}x{shape[1]}':>14} {run._size(wide):>10} {'':>10} "
+              f"{run._size(per_symbol):>10} {run._size(per_year):>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Bytes per callback output, as plain JSON, with typed arrays, and compressed.
+
+    python benchmarks/payloads.py                 # 100k rows, 1,000 tickers
+    python benchmarks/payloads.py --rows 1000000 --tickers 5000
+
+Every server output of one app2 selection (run.app2_charts) and of app.py's
+figure callbacks is serialized the way Dash sends it, once with
+figures.TYPED_ARRAYS off and once on; the typed version is then compressed
+with gzip and brotli at the levels flask-compress uses.
+"""
+import argparse
+import gzip
+import brotli
+import plotly.io as pio
+import run
+import figures
+
+
+def outputs(rows, tickers):
+    """(callback, output, value) for every output, computed with the current TYPED_ARRAYS setting."""
+    run.reset()
+    values = [('update_chart', 'comparison-chart', run.bench_update_chart(tickers)()()),
+              ('update_line_chart', 'line-chart', run.bench_update_line_chart(rows)()())]
+    values += [('app2.charts', output, value)
+               for output, value in zip(run.APP2_OUTPUTS, run.bench_app2_charts(rows)()())]
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--tickers', type=int, default=1_000)
+    args = parser.parse_args(argv)
+
+    figures.TYPED_ARRAYS = False
+    plain = outputs(args.rows, args.tickers)
+    figures.TYPED_ARRAYS = True
+    typed = outputs(args.rows, args.tickers)
+
+    print(f"{'callback':<20} {'output':<18} {'json':>10} {'typed':>10} {'gzip':>10} {'brotli':>10}")
+    totals = [0, 0, 0, 0]
+    for (callback, output, before), (_, _, after) in zip(plain, typed):
+        encoded = pio.json.to_json_plotly(after).encode()
+        sizes = [len(pio.json.to_json_plotly(before)), len(encoded),
+                 len(gzip.compress(encoded, 6)), len(brotli.compress(encoded, quality=4))]
+        totals = [t + s for t, s in zip(totals, sizes)]
+        print(f"{callback:<20} {output:<18} " + ' '.join(f"{run._size(s):>10}" for s in sizes))
+    print(f"{'total':<39} " + ' '.join(f"{run._size(s):>10}" for s in totals))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""Benchmarks for the data and callback hot paths.
+
+    python benchmarks/run.py                      # every benchmark up to 1M rows
+    python benchmarks/run.py --full               # up to 10M rows
+    python benchmarks/run.py --only chart --save results.json
+    python benchmarks/run.py --compare results.json
+
+Each benchmark runs the real function on synthetic data at several scales and
+reports the best and median wall time, the peak memory allocated during one
+run (tracemalloc) and the size of the JSON the browser would receive. With
+--compare, a benchmark that got slower or larger than --threshold times the
+saved baseline is reported and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# No network, a throwaway store, and no background refresh replacing our snapshot
+os.environ.setdefault('MARKET_DATA_PROVIDER', 'synthetic')
+os.environ.setdefault('DASHBOARD_DATA_DIR', tempfile.mkdtemp(prefix='dashboard-bench-'))
+os.environ.setdefault('DASHBOARD_REFRESH_INTERVAL', str(10 ** 9))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import plotly.utils
+import app
+import app2
+import dashboard_data
+import fundamentals
+import indicators
+import live
+import providers
+import refresh
+import store
+from range_cache import RangeCache
+import synthetic
+
+ROWS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+TICKERS = [10, 100, 1_000, 5_000]
+
+
+def payload_bytes(output):
+    """Size of an output serialized the way Dash sends it, or None for plain frames."""
+    if output is None or hasattr(output, 'to_numpy') or (isinstance(output, tuple) and hasattr(output[0], 'to_numpy')):
+        return None
+    if isinstance(output, bytes):
+        return len(output)
+    return len(json.dumps(output, cls=plotly.utils.PlotlyJSONEncoder))
+
+
+def reset():
+    """Drop every cache a benchmark run could be served from, so each run is a cold one."""
+    with indicators._lock:
+        indicators._cache.clear()
+    app2.load_dataset.cache_clear()
+    app2.datasets.clear()
+    fundamentals._cache.clear()
+    shutil.rmtree(os.path.join(store.DATA_DIR, synthetic.StubProvider.name), ignore_errors=True)
+
+
+# Each benchmark takes its scale and returns prepare(); prepare() does the
+# untimed setup for one run and returns the call to time.
+
+def bench_process_data(rows):
+    data = synthetic.ohlcv(rows)
+    return lambda: (lambda copy=data.copy(): app2.process_data(copy))
+
+
+def bench_compute_RSI(rows):
+    data = synthetic.ohlcv(rows)
+    return lambda: (lambda: app2.compute_RSI(data))
+
+
+def bench_compute_MACD(rows):
+    data = synthetic.ohlcv(rows)
+    return lambda: (lambda: app2.compute_MACD(data))
+
+
+def bench_extract_metrics(n_tickers):
+    symbols = synthetic.tickers(n_tickers)
+    providers.set_provider(synthetic.StubProvider())
+    # The stub answers instantly; the rate limit is for Yahoo's sake, not part of what we measure
+    fundamentals.MAX_RATE = float('inf')
+    return lambda: (lambda: dashboard_data.extract_metrics(symbols))
+
+
+def _install_snapshot(n_tickers, rows=1260):
+    # The synthetic universe's '-USD' pairs are its cryptocurrencies
+    dashboard_data.crypto_tickers = [s for s in synthetic.tickers(n_tickers) if s.endswith('-USD')]
+    refresh._snapshot = refresh.build_snapshot(synthetic.frames(n_tickers, rows))
+
+
+def bench_update_chart(n_tickers):
+    _install_snapshot(n_tickers)
+    return lambda: (lambda: app.update_chart(['Hardware', 'Software', 'Digital Media'], 'Change %', '1y', ['^GSPC'], 'mean'))
+
+
+def bench_update_line_chart(rows):
+    _install_snapshot(10, rows)
+    companies = dashboard_data.line_chart_top_companies
+    return lambda: (lambda: app.update_line_chart(companies, ['aggregate'], companies[0]))
+
+
+def bench_page_summary(n_tickers):
+    _install_snapshot(n_tickers)
+    client = app.app.server.test_client()
+    # A filter every row with a price passes (no change is below -100%), so the
+    # first page is full at every scale whatever the synthetic changes are
+    table = [('summary-table-name', 'data', 'crypto'), ('summary-table', 'page_current', 0),
+             ('summary-table', 'page_size', 10),
+             ('summary-table', 'sort_by', [{'column_id': 'Change %', 'direction': 'desc'}]),
+             ('summary-table', 'filter_query', '{Change %} > -100')]
+    body = {
+        'output': '..summary-table.data...summary-table.page_count..',
+        'outputs': [{'id': 'summary-table', 'property': 'data'}, {'id': 'summary-table', 'property': 'page_count'}],
+        'inputs': [{'id': id, 'property': prop, 'value': value} for id, prop, value in table],
+        'changedPropIds': ['summary-table.sort_by'],
+    }
+    # Through Dash's dispatch, so the payload is the page the browser receives
+    return lambda: (lambda: client.post('/_dash-update-component', json=body).data)
+
+
+# app2's server outputs for one selection, in the order app2_charts returns them
+APP2_OUTPUTS = ['candlestick-chart', 'rsi-chart', 'macd-chart', 'bar-chart', '3d-plot', 'histogram', 'pie-chart',
+                'treemap']
+
+
+def app2_charts(symbol, start_date, end_date, indicators_=('EMA', 'RSI', 'MACD')):
+    """Every app2 callback a new symbol or range runs on the server, with the sidebar's default parameters."""
+    key = app2.select_dataset(symbol, start_date, end_date)
+    selected = list(indicators_)
+    return (app2.update_candlestick(key, selected, 12, 26, None, None, 600),
+            app2.update_rsi(key, selected, 14, None, 200),
+            app2.update_macd(key, selected, 12, 26, 9, None, 300),
+            app2.update_bar_chart(key), app2.update_3d_plot(key), app2.update_histogram(key),
+            app2.update_pie_chart(key), app2.update_treemap(key))
+
+
+def bench_app2_charts(rows):
+    data = synthetic.ohlcv(rows)
+    app2.history_cache = RangeCache(lambda symbol, start, end, interval: data[(data.index >= start) & (data.index < end)])
+    start = str(data.index[0].date())
+    end = str((data.index[-1] + pd.Timedelta(days=1)).date())
+    return lambda: (lambda: app2_charts('BENCH', start, end))
+
+
+def bench_stream_bars(rows):
+    data = synthetic.ohlcv(rows)
+    app2.history_cache = RangeCache(lambda symbol, start, end, interval: data[(data.index >= start) & (data.index < end)])
+    key = {'symbol': 'BENCH', 'start_date': str(data.index[0].date()),
+           'end_date': str((data.index[-1] + pd.Timedelta(days=1)).date())}
+    # A feed on a clock we move by one bar per run, so each timed poll has exactly one new bar
+    clock = [0.0]
+    live.feed = live.SimulatedFeed(clock=lambda: clock[0])
+    state = live.session_state(True, None)
+
+    def prepare():
+        indicators_ = ['EMA', 'RSI', 'MACD']
+        app2.update_candlestick(key, indicators_, 12, 26, None, state, 600)
+        app2.update_rsi(key, indicators_, 14, state, 200)
+        app2.update_macd(key, indicators_, 12, 26, 9, state, 300)
+        clock[0] += live.feed.bar_seconds
+        return lambda: app2.stream_bars(1, state, key)
+    return prepare
+
+
+BENCHMARKS = [
+    ('process_data', 'rows', ROWS, bench_process_data),
+    ('compute_RSI', 'rows', ROWS, bench_compute_RSI),
+    ('compute_MACD', 'rows', ROWS, bench_compute_MACD),
+    ('extract_metrics', 'tickers', TICKERS, bench_extract_metrics),
+    ('update_chart', 'tickers', TICKERS, bench_update_chart),
+    ('update_line_chart', 'rows', ROWS, bench_update_line_chart),
+    ('page_summary', 'tickers', TICKERS, bench_page_summary),
+    ('app2.charts', 'rows', ROWS, bench_app2_charts),
+    ('app2.stream_bars', 'rows', ROWS, bench_stream_bars),
+]
+
+
+def measure(prepare, repeat):
+    times = []
+    for _ in range(repeat):
+        reset()
+        run = prepare()
+        started = time.perf_counter()
+        output = run()
+        times.append(time.perf_counter() - started)
+
+    # Peak memory from a separate run: tracemalloc slows down what it traces
+    reset()
+    run = prepare()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'best_s': min(times), 'median_s': statistics.median(times),
+            'peak_bytes': peak, 'payload_bytes': payload_bytes(output)}
+
+
+def _size(n):
+    if n is None:
+        return '-'
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if n < 1024 or unit == 'GB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', help='run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-rows', type=int, default=1_000_000)
+    parser.add_argument('--max-tickers', type=int, default=5_000)
+    parser.add_argument('--full', action='store_true', help='every scale, up to 10M rows')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file written by --save')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    args = parser.parse_args(argv)
+    limits = {'rows': max(ROWS) if args.full else args.max_rows, 'tickers': args.max_tickers}
+
+    results = {}
+    print(f"{'benchmark':<20} {'scale':>16} {'best':>9} {'median':>9} {'peak mem':>10} {'payload':>10}")
+    for name, unit, scales, setup in BENCHMARKS:
+        if args.only and args.only not in name:
+            continue
+        for scale in scales:
+            if scale > limits[unit]:
+                continue
+            result = measure(setup(scale), args.repeat)
+            results[f"{name}[{scale} {unit}]"] = result
+            print(f"{name:<20} {f'{scale:,} {unit}':>16} {result['best_s'] * 1000:>7.1f}ms "
+                  f"{result['median_s'] * 1000:>7.1f}ms {_size(result['peak_bytes']):>10} "
+                  f"{_size(result['payload_bytes']):>10}", flush=True)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = []
+        for key, result in results.items():
+            for metric in ('best_s', 'peak_bytes', 'payload_bytes'):
+                before, after = baseline.get(key, {}).get(metric), result[metric]
+                if before and after and after > before * args.threshold:
+                    regressions.append(f"{key} {metric}: {before:.4g} -> {after:.4g} ({after / before:.2f}x)")
+        print('\n'.join(['', 'Regressions:'] + regressions) if regressions else '\nNo regressions.')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Upstream fetches and dataset builds when many workers open the same app2 view at once.
+
+    python benchmarks/single_flight.py                  # 8 workers, 0.5 s provider latency
+    python benchmarks/single_flight.py --workers 32 --latency 2
+
+Each worker is a forked process that waits at a barrier, then asks for the
+same dataset, as gunicorn workers serving users who all open the default view.
+With the shared cache (shared_cache.py) one of them fetches and processes it
+and the others read its result.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# No network, and a throwaway store and cache shared by the workers below
+os.environ.setdefault('MARKET_DATA_PROVIDER', 'synthetic')
+os.environ.setdefault('DASHBOARD_DATA_DIR', tempfile.mkdtemp(prefix='dashboard-bench-'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import app2
+import providers
+
+
+class SlowProvider(providers.MarketDataProvider):
+    """The configured provider, taking latency seconds per history call and logging each one to log_path."""
+
+    def __init__(self, inner, latency, log_path):
+        self.inner = inner
+        self.name = inner.name
+        self.latency = latency
+        self.log_path = log_path
+
+    def history(self, symbol, start=None, end=None, interval='1d', auto_adjust=True, actions=True):
+        with open(self.log_path, 'a') as f:
+            f.write(f'{os.getpid()} {symbol}\n')
+        time.sleep(self.latency)
+        return self.inner.history(symbol, start=start, end=end, interval=interval,
+                                  auto_adjust=auto_adjust, actions=actions)
+
+
+def worker(barrier, key, results):
+    barrier.wait()
+    started = time.perf_counter()
+    app2.get_dataset(key)
+    results.put((time.perf_counter() - started, app2.datasets.misses))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.5, help='seconds per provider history call')
+    parser.add_argument('--symbol', default='AAPL')
+    args = parser.parse_args(argv)
+
+    log_path = os.path.join(os.environ['DASHBOARD_DATA_DIR'], 'fetches.log')
+    # Empty when the store is already warm and nothing is fetched
+    open(log_path, 'w').close()
+    providers.set_provider(SlowProvider(providers.get_provider(), args.latency, log_path))
+    end = pd.Timestamp.now().normalize()
+    key = {'symbol': args.symbol, 'start_date': str((end - pd.Timedelta(days=365)).date()),
+           'end_date': str(end.date())}
+
+    context = multiprocessing.get_context('fork')
+    barrier, results = context.Barrier(args.workers), context.Queue()
+    processes = [context.Process(target=worker, args=(barrier, key, results)) for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    timings = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    with open(log_path) as f:
+        fetches = len(f.readlines())
+    seconds = sorted(elapsed for elapsed, _ in timings)
+    print(f"workers           {args.workers}")
+    print(f"upstream fetches  {fetches}")
+    print(f"dataset builds    {sum(misses for _, misses in timings)}")
+    print(f"latency           min {seconds[0]:.2f}s  max {seconds[-1]:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import dashboard_data
+import fundamentals
+import providers
+import rollups
+import store
+
+# Synthetic inputs for the benchmarks, sized by row and ticker count and shaped
+# like what the dashboards get from the store and the refresh snapshot.
+
+# Bars end here, so period lookbacks ('1y', '5y') always find data
+END = pd.Timestamp.now().normalize()
+
+
+def ohlcv(rows, seed=0, freq='min'):
+    """rows OHLCV bars (minute bars by default, so 10M rows still fit in a datetime index)."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(end=END, periods=rows, freq=freq, name='Date')
+    bars = providers.synthetic_bars(rows, rng)
+    return pd.DataFrame(bars, index=index)[store.HISTORY_COLUMNS]
+
+
+def tickers(n, crypto_share=0.2):
+    """n ticker names; about crypto_share of them are '-USD' pairs, as in the summary panel."""
+    n_crypto = int(n * crypto_share)
+    return [f'S{i:04d}' for i in range(n - n_crypto)] + [f'C{i:04d}-USD' for i in range(n_crypto)]
+
+
+def wide(symbols, rows, seed=0, freq='B', fields=store.DOWNLOAD_COLUMNS):
+    """Bars for several tickers with (Price, Ticker) columns, like store.download."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(end=END, periods=rows, freq=freq, name='Date')
+    columns = {}
+    for symbol in symbols:
+        bars = providers.synthetic_bars(rows, rng, start_price=10 ** rng.uniform(0, 3))
+        for field in fields:
+            columns[(field, symbol)] = bars[field]
+    data = pd.DataFrame(columns, index=index)
+    data.columns.names = ['Price', 'Ticker']
+    return data.sort_index(axis=1)
+
+
+def metrics(symbols, seed=0):
+    """A sector metrics frame like dashboard_data.extract_metrics returns."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.lognormal(0, 1, (len(symbols), len(fundamentals.METRIC_COLUMNS))),
+                        index=symbols, columns=fundamentals.METRIC_COLUMNS)
+
+
+def pyramid(symbols, rows=1260):
+    """A rollup pyramid over rows daily bars of symbols, like dashboard_data.update_pyramid builds."""
+    levels = rollups.Pyramid()
+    levels.extend(wide(symbols, rows, seed=1), '1d')
+    return levels
+
+
+def frames(n_tickers, rows=1260):
+    """Snapshot frames like dashboard_data.build_frames, for n_tickers tickers.
+
+    Equities are split over the three sectors; rows sets the length of the daily
+    rollup base and of the line chart's (minute) price history.
+    """
+    symbols = tickers(n_tickers)
+    equities = [s for s in symbols if not s.endswith('-USD')]
+    sectors = np.array_split(np.array(equities), 3)
+    indexes = dashboard_data.index_tickers
+
+    levels = pyramid(equities + indexes, min(rows, 1260)).levels
+
+    top = ohlcv(rows, seed=2)['Close']
+    top_companies_data = pd.DataFrame({company: top * (1 + i / 10)
+                                       for i, company in enumerate(dashboard_data.line_chart_top_companies)})
+
+    groups = {**{sector: list(members) for sector, members in zip(dashboard_data.SECTORS, sectors)}, 'Index': indexes}
+    table = dashboard_data.metrics_table(metrics(equities + indexes, seed=4), groups, levels)
+
+    return {
+        'all_data': dashboard_data.compact(wide(symbols, 5, seed=3, fields=['Close'])),
+        'top_companies_data': dashboard_data.compact(top_companies_data),
+        'sector_metrics': dashboard_data.compact(table),
+        'sector_aggregates': dashboard_data.compact(dashboard_data.sector_aggregates(table)),
+    }
+
+
+class StubProvider(providers.MarketDataProvider):
+    """Answers .info instantly with random fundamentals, so extract_metrics measures our own work."""
+
+    name = 'benchmark-stub'
+
+    def __init__(self, seed=0):
+        self.rng = np.random.default_rng(seed)
+
+    def info(self, symbol):
+        info = {key: float(self.rng.lognormal(0, 1)) for key in fundamentals.METRIC_FIELDS.values()}
+        info['longName'] = f"{symbol} Benchmark Inc."
+        return info
@@ -0,0 +1,136 @@
+import os
+import numpy as np
+import pandas as pd
+import fundamentals
+import rollups
+import store
+import universe
+
+# Data behind app.py. build_frames() is run once, either in the gunicorn master
+# (see gunicorn.conf.py) or by app.py itself when it runs standalone.
+
+# Tickers by asset class and sector, from the universe file (see universe.py)
+members = universe.load()
+equity_tickers = universe.tickers(members, asset_class='equity')
+crypto_tickers = universe.tickers(members, asset_class='crypto')  # Cryptocurrencies
+index_tickers = universe.tickers(members, asset_class='index')  # S&P 500 and NASDAQ
+
+# Display names for sectors whose universe name is a short one
+SECTOR_LABELS = {'Digital Media': 'Digital Media & Online Advertising'}
+# Sectors of the comparison chart: selector value -> (label, tickers)
+SECTORS = {sector: (SECTOR_LABELS.get(sector, sector), universe.tickers(members, 'equity', sector))
+           for sector in universe.sectors(members)}
+# Rows of the sector metrics table: the sectors plus the indexes they can be compared with
+METRIC_GROUPS = {**{sector: tickers for sector, (_, tickers) in SECTORS.items()}, 'Index': index_tickers}
+# Timeframe selector values the price metrics are precomputed for
+TIMEFRAMES = rollups.LEVEL_ORDER + rollups.PERIODS
+# Per-sector aggregate rows: selector value -> label
+AGGREGATES = {'mean': 'Mean', 'median': 'Median', 'weighted': 'Market-cap weighted'}
+
+# Tickers with price rollups for the comparison chart's timeframe selector
+rollup_tickers = [ticker for _, tickers in SECTORS.values() for ticker in tickers] + index_tickers
+# Days of 1-minute bars kept as the finest rollup level (all Yahoo serves at 1m)
+INTRADAY_DAYS = 7
+
+#line chart variables
+line_chart_top_companies = ['AAPL', 'NVDA', 'MSFT', 'GOOGL', 'AMZN']
+
+# A frame is served as float32 when that changes no value by more than this
+# (relative); float32 resolves about 7 significant digits
+FLOAT32_RTOL = float(os.environ.get('DASHBOARD_FLOAT32_RTOL', 1e-6))
+
+def compact(frame):
+    """frame as float32 if that keeps it within FLOAT32_RTOL, else as float64.
+
+    Frames are published as one array (shared_data), so a frame has one dtype.
+    """
+    values = frame.to_numpy(dtype='float64')
+    narrow = values.astype('float32')
+    with np.errstate(over='ignore', invalid='ignore'):
+        fits = np.allclose(narrow, values, rtol=FLOAT32_RTOL, atol=0, equal_nan=True)
+    return frame.astype('float32' if fits else 'float64')
+
+# Function to fetch stock data; only the Close prices are used
+def fetch_stock_data(tickers):
+    data = store.download(tickers, period="5d", fields=['Close'])
+    data = data.ffill().bfill()
+    return data
+
+# Function to fetch stock data for line chart
+def fetch_stock_data_line_chart(tickers, period="5d"):
+    data = store.download(tickers, period=period, fields=['Close'])
+    data = data.ffill().bfill()
+    return data
+
+# Extract important metrics for each sector
+def extract_metrics(tickers):
+    rows = fundamentals.fetch_rows(tickers)
+    return pd.DataFrame({ticker: rows[ticker] for ticker in tickers}, index=fundamentals.METRIC_COLUMNS).T
+
+def metrics_table(metrics, groups, levels):
+    """One (sector, ticker) x (metric, timeframe) table for the comparison chart.
+
+    Fundamentals sit under timeframe '' and Price / Change % under every
+    selector timeframe, so a chart is one column lookup.
+    """
+    index = pd.MultiIndex.from_tuples([(sector, ticker) for sector, tickers in groups.items() for ticker in tickers],
+                                      names=['sector', 'ticker'])
+    tickers = index.get_level_values('ticker')
+    columns = {(metric, ''): metrics[metric].reindex(tickers).to_numpy() for metric in fundamentals.METRIC_COLUMNS}
+    for timeframe in TIMEFRAMES:
+        prices = rollups.price_metrics(levels, timeframe).reindex(tickers)
+        for metric in rollups.PRICE_METRICS:
+            columns[(metric, timeframe)] = prices[metric].to_numpy()
+    table = pd.DataFrame(columns, index=index, dtype='float64')
+    table.columns.names = ['metric', 'timeframe']
+    return table
+
+def sector_aggregates(table):
+    """(sector, aggregate) rows of every column: mean, median and market-cap-weighted mean."""
+    by_sector = table.groupby(level='sector', sort=False)
+    weights = table[('Market Cap', '')]
+    # Weight each value by market cap, over the tickers that have both
+    weighted = table.mul(weights, axis=0).groupby(level='sector', sort=False).sum(min_count=1) / \
+        table.notna().mul(weights, axis=0).groupby(level='sector', sort=False).sum(min_count=1)
+    aggregates = pd.concat({'mean': by_sector.mean(), 'median': by_sector.median(), 'weighted': weighted},
+                           names=['aggregate'])
+    return aggregates.swaplevel().sort_index(level='sector', sort_remaining=False)
+
+# Extended on every rebuild with just the bars that arrived since the last one
+pyramid = rollups.Pyramid()
+
+def update_pyramid():
+    now = pd.Timestamp.now()
+    intraday_start = now.normalize() - pd.Timedelta(days=INTRADAY_DAYS)
+    for base, interval, start in (('1m', '1m', intraday_start), ('1d', '1d', store.period_start('5y'))):
+        # Start from the last bar we hold, which may have been a partial one
+        last = pyramid.last_timestamp(base)
+        # The 1m files are trimmed to the same window as the levels, or they would grow on every refresh
+        bars = store.download(rollup_tickers, start=last if last is not None else start, interval=interval,
+                              keep_from=intraday_start if base == '1m' else None)
+        pyramid.extend(bars.dropna(how='all'), base, keep_from=start)
+    return {'rollup_' + level: bars for level, bars in pyramid.levels.items() if bars is not None}
+
+def build_frames():
+    """Download and compute every frame app.py serves, keyed by the name app.py uses for it.
+
+    The rollup levels only feed the metrics table, so they stay in this
+    process; what is served is Close prices and the precomputed tables,
+    each as float32 where that keeps its precision.
+    """
+    top_companies_data = fetch_stock_data_line_chart(line_chart_top_companies, period="5y")['Close']
+
+    # Every equity and cryptocurrency in one chunked bulk download
+    all_data = fetch_stock_data(equity_tickers + crypto_tickers)
+
+    levels = update_pyramid()
+    # Fundamentals for every sector and index ticker are fetched in one concurrent batch
+    table = metrics_table(extract_metrics(rollup_tickers), METRIC_GROUPS, rollups.levels_from_frames(levels))
+
+    return {
+        'all_data': compact(all_data),
+        'top_companies_data': compact(top_companies_data),
+        'sector_metrics': compact(table),
+        # Aggregated at full precision, then narrowed
+        'sector_aggregates': compact(sector_aggregates(table)),
+    }
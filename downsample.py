@@ -0,0 +1,89 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Server-side downsampling for long price series: each bucket's lowest and
+# highest point for lines and min/max-preserving buckets for OHLC bars, both
+# vectorized over the buckets. Figures are cut to the visible
+# x-range (from the graph's relayoutData) and reduced to about as many points as
+# the chart has pixels, so zooming in re-queries at a finer resolution and the
+# payload stays bounded however much history is selected.
+
+# Chart width the resolution is matched to, and points per pixel
+CHART_WIDTH = int(os.environ.get('CHART_WIDTH_PX', 1200))
+POINTS_PER_PIXEL = float(os.environ.get('POINTS_PER_PIXEL', 2))
+
+
+def target_points(width=CHART_WIDTH):
+    return max(3, int(width * POINTS_PER_PIXEL))
+
+
+def visible_range(relayout_data):
+    """(start, end) of the zoomed x-axis, or None for the full range."""
+    if not relayout_data or relayout_data.get('xaxis.autorange'):
+        return None
+    if 'xaxis.range[0]' in relayout_data:
+        return pd.Timestamp(relayout_data['xaxis.range[0]']), pd.Timestamp(relayout_data['xaxis.range[1]'])
+    if 'xaxis.range' in relayout_data:
+        start, end = relayout_data['xaxis.range']
+        return pd.Timestamp(start), pd.Timestamp(end)
+    return None
+
+
+def window(data, relayout_data, margin=0.5):
+    """Rows of data inside the visible range, padded by margin of its width on each side for panning."""
+    bounds = visible_range(relayout_data)
+    if bounds is None:
+        return data
+    start, end = bounds
+    pad = (end - start) * margin
+    return data[(data.index >= start - pad) & (data.index <= end + pad)]
+
+
+def minmax(y, n):
+    """Indices of at most n points of y: the first, the last, and each bucket's lowest and highest point in order.
+
+    Keeping both extremes of every bucket draws the same envelope as the full
+    line at the chart's resolution, spikes included.
+    """
+    length = len(y)
+    if n >= length or n < 4:
+        return np.arange(length)
+    inner = np.asarray(y, dtype='float64')[1:-1]
+    buckets = (n - 2) // 2
+    bucket = np.arange(len(inner)) * buckets // len(inner)
+    starts = np.flatnonzero(np.diff(bucket, prepend=-1))
+    picked = [[0, length - 1]]
+    # fmin/fmax skip NaNs (e.g. the start of a rolling indicator); an all-NaN bucket keeps its first row
+    for extreme in (np.fmin.reduceat(inner, starts), np.fmax.reduceat(inner, starts)):
+        hits = np.flatnonzero(inner == extreme[bucket])
+        picked.append(1 + hits[np.unique(bucket[hits], return_index=True)[1]])
+        picked.append(1 + starts[np.isnan(extreme)])
+    return np.unique(np.concatenate(picked))
+
+
+def downsample_series(series, n=None):
+    """A series reduced to at most n points (see minmax); shorter series come back unchanged."""
+    n = n or target_points()
+    if len(series) <= n:
+        return series
+    return series.iloc[minmax(series.to_numpy(), n)]
+
+
+def downsample_ohlc(data, n=None):
+    """OHLCV bars merged into n buckets of consecutive rows, keeping each bucket's
+    first open, highest high, lowest low, last close and total volume."""
+    n = n or target_points()
+    if len(data) <= n:
+        return data
+    bucket = np.arange(len(data)) * n // len(data)
+    starts = np.flatnonzero(np.diff(bucket, prepend=-1))
+    ends = np.append(starts[1:], len(data)) - 1
+    aggregated = pd.DataFrame({
+        'Open': data['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(data['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(data['Low'].to_numpy(), starts),
+        'Close': data['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(data['Volume'].to_numpy(), starts),
+    }, index=data.index[starts])
+    return aggregated
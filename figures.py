@@ -0,0 +1,129 @@
+import base64
+import datetime
+import os
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objs as go
+import plotly.io as pio
+
+# Trace factory shared by the dashboards. Scatter traces switch to WebGL
+# (Scattergl) above WEBGL_THRESHOLD points, the same cut-off plotly express uses
+# for render_mode='auto', so large traces stay interactive in the browser.
+
+WEBGL_THRESHOLD = int(os.environ.get('WEBGL_THRESHOLD', 1000))
+
+# Figures leave the callbacks through compact(): numeric arrays are sent as
+# plotly.js typed arrays ({dtype, bdata}: base64 of the raw bytes) instead of
+# lists of decimal strings, and dates on a date axis as epoch milliseconds.
+# TYPED_ARRAYS=0 sends plain JSON lists again, e.g. to compare payload sizes.
+TYPED_ARRAYS = os.environ.get('TYPED_ARRAYS', '1') != '0'
+
+# Dash serializes callback responses with plotly's encoder; orjson is several times faster
+pio.json.config.default_engine = 'orjson'
+
+# numpy dtype -> plotly.js typed array dtype
+TYPED_DTYPES = {'float64': 'f8', 'float32': 'f4', 'int32': 'i4', 'uint32': 'u4',
+                'int16': 'i2', 'uint16': 'u2', 'int8': 'i1', 'uint8': 'u1'}
+# Shorter arrays stay JSON lists: the dict around a typed array costs more than it saves
+TYPED_MIN_LENGTH = 16
+_INT32 = np.iinfo(np.int32)
+
+
+def scatter(x, y, webgl=True, **kwargs):
+    """go.Scatter, or go.Scattergl when the trace has more than WEBGL_THRESHOLD points.
+
+    Pass webgl=False for a trace on an axis with rangebreaks: plotly.js hides
+    scattergl traces there.
+    """
+    trace = go.Scattergl if webgl and len(x) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=x, y=y, **kwargs)
+
+
+def customdata(*columns):
+    """Hover columns as one 2-D array (rows are points), instead of a list of tuples."""
+    if all(np.issubdtype(np.asarray(c).dtype, np.number) for c in columns):
+        return np.column_stack(columns)
+    # Mixed columns: an object array keeps strings as strings and numbers as numbers
+    data = np.empty((len(columns[0]), len(columns)), dtype=object)
+    for i, column in enumerate(columns):
+        data[:, i] = column
+    return data
+
+
+def scatter_3d(data, x, y, z, color=None, **kwargs):
+    """px.scatter_3d (always WebGL) fed only the columns it plots, without rows it cannot draw."""
+    columns = [c for c in (x, y, z, color) if c is not None]
+    return px.scatter_3d(data[columns].dropna(subset=[x, y, z]), x=x, y=y, z=z, color=color, **kwargs)
+
+
+def _typed(array):
+    """A 1-D numeric array as a typed-array dict, or None if plotly.js has no typed array for it."""
+    if array.ndim != 1:
+        return None
+    if array.dtype.kind in 'iu' and array.dtype.name not in TYPED_DTYPES:
+        # 64-bit integers (volumes, counts): int32 when they fit, else float64, which is exact to 2**53
+        fits = array.size == 0 or (array.min() >= _INT32.min and array.max() <= _INT32.max)
+        array = array.astype('int32' if fits else 'float64')
+    elif array.dtype.kind == 'b':
+        array = array.astype('uint8')
+    if array.dtype.name not in TYPED_DTYPES:
+        return None
+    return {'dtype': TYPED_DTYPES[array.dtype.name], 'bdata': base64.b64encode(np.ascontiguousarray(array)).decode()}
+
+
+def _epoch_ms(array):
+    """Dates (datetime64 or an object array of timestamps) as float64 epoch milliseconds, else None."""
+    if array.dtype.kind == 'O':
+        if not len(array) or not isinstance(array[0], (datetime.date, np.datetime64)):
+            return None
+        array = pd.DatetimeIndex(array).to_numpy()
+    if array.dtype.kind != 'M':
+        return None
+    ms = array.astype('datetime64[ms]').astype('int64').astype('float64')
+    ms[np.isnat(array)] = np.nan
+    return ms
+
+
+def _compact_trace(trace, layout):
+    """A copy of trace with its arrays converted; nothing the figure holds is modified."""
+    compacted = {}
+    for key, value in trace.items():
+        if isinstance(value, dict):
+            value = _compact_trace(value, layout)
+        elif isinstance(value, np.ndarray) and value.size >= TYPED_MIN_LENGTH:
+            typed = value
+            if key in ('x', 'y') and 'scene' not in trace:
+                ms = _epoch_ms(value)
+                if ms is not None:
+                    # Numbers on an axis are only read as dates when the axis says so
+                    axis = key + 'axis' + trace.get(key + 'axis', key)[1:]
+                    axis_layout = layout.get(axis, {})
+                    typed = ms if axis_layout.get('type', 'date') == 'date' else None
+                    if typed is not None:
+                        layout[axis] = {**axis_layout, 'type': 'date'}
+            typed = _typed(typed) if typed is not None else None
+            if typed is not None:
+                value = typed
+        compacted[key] = value
+    return compacted
+
+
+def compact(fig, extendable=False):
+    """fig as the dict Dash sends, with numeric and date arrays as typed arrays (see TYPED_ARRAYS).
+
+    Figures that live mode appends to (extendable) keep plain arrays:
+    plotly.js can only extend arrays, not typed-array specs.
+    """
+    if not TYPED_ARRAYS or extendable:
+        return fig
+    # Built from the figure's own property dicts: to_plotly_json() would deep-copy every array first
+    layout = dict(fig._layout)
+    data = [_compact_trace(trace, layout) for trace in fig._data]
+    # The template carries defaults for every trace type; keep only those of the traces we send
+    template = layout.get('template')
+    if isinstance(template, dict) and 'data' in template:
+        types = {trace.get('type', 'scatter') for trace in data}
+        layout['template'] = {**template,
+                              'data': {kind: defaults for kind, defaults in template['data'].items() if kind in types}}
+    return {'data': data, 'layout': layout}
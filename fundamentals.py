@@ -0,0 +1,133 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import providers
+import store
+
+# Fundamentals (yf.Ticker(...).info) fetched concurrently with a bounded pool,
+# retried with exponential backoff, and kept in a TTL cache of parsed metric
+# rows that survives restarts: fundamentals change daily, not per worker boot.
+
+# Concurrent .info requests in flight at most
+CONCURRENCY = int(os.environ.get('FUNDAMENTALS_CONCURRENCY', 8))
+# Requests started per second at most, across all threads
+MAX_RATE = float(os.environ.get('FUNDAMENTALS_MAX_RATE', 10))
+RETRIES = int(os.environ.get('FUNDAMENTALS_RETRIES', 3))
+BACKOFF = float(os.environ.get('FUNDAMENTALS_BACKOFF', 0.5))
+# Seconds a parsed row is served from the cache
+TTL = float(os.environ.get('FUNDAMENTALS_TTL', 24 * 60 * 60))
+
+# Metric name -> key in the .info dict
+METRIC_FIELDS = {
+    'Market Cap': 'marketCap',
+    'P/E Ratio': 'trailingPE',
+    'Volume': 'volume',
+    'EPS (ttm)': 'trailingEps',
+    '52 Week High': 'fiftyTwoWeekHigh',
+    'Sales Y/Y': 'revenueGrowth',
+    'Profit Margin': 'profitMargins',
+    'Target Price': 'targetMeanPrice',
+    '52 Week Low': 'fiftyTwoWeekLow',
+    'EPS Y/Y TTM': 'earningsGrowth',
+    'Forward P/E': 'forwardPE',
+    'Beta': 'beta',
+    'Avg Volume': 'averageVolume',
+}
+METRIC_COLUMNS = list(METRIC_FIELDS)
+
+_cache = {}
+# Tickers served from the cache, and tickers fetched because they were missing or expired
+hits = 0
+misses = 0
+_cache_lock = threading.Lock()
+_rate_lock = threading.Lock()
+_next_request = 0.0
+
+
+def _cache_path():
+    return os.path.join(store.DATA_DIR, providers.get_provider().name, 'fundamentals.json')
+
+
+def _load_cache():
+    path = _cache_path()
+    if path in _cache:
+        return _cache[path]
+    rows = {}
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                rows = json.load(f)
+        except ValueError:
+            rows = {}
+    _cache[path] = rows
+    return rows
+
+
+def _save_cache(rows):
+    path = _cache_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(rows, f)
+    os.replace(tmp, path)
+
+
+def parse_info(info):
+    """One metric row from an .info dict, with the same coercion extract_metrics always used."""
+    row = {name: float(pd.to_numeric(info.get(key, 0), errors='coerce')) for name, key in METRIC_FIELDS.items()}
+    row['Name'] = info.get('longName')
+    return row
+
+
+def _throttle():
+    global _next_request
+    with _rate_lock:
+        now = time.monotonic()
+        wait = _next_request - now
+        _next_request = max(now, _next_request) + 1.0 / MAX_RATE
+    if wait > 0:
+        time.sleep(wait)
+
+
+def _fetch_row(ticker):
+    provider = providers.get_provider()
+    for attempt in range(RETRIES + 1):
+        _throttle()
+        try:
+            return parse_info(provider.info(ticker))
+        except Exception as e:
+            if attempt == RETRIES:
+                print(f"Error fetching fundamentals for {ticker}: {e}")
+                return None
+            # Exponential backoff with jitter, so retries from all threads do not line up
+            time.sleep(BACKOFF * 2 ** attempt * (1 + random.random()))
+
+
+def fetch_rows(tickers):
+    """Parsed metric rows for tickers; anything missing or expired is fetched concurrently."""
+    with _cache_lock:
+        rows = _load_cache()
+        now = time.time()
+        missing = [t for t in dict.fromkeys(tickers)
+                   if t not in rows or now - rows[t]['fetched_at'] > TTL]
+        global hits, misses
+        misses += len(missing)
+        hits += len(dict.fromkeys(tickers)) - len(missing)
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(CONCURRENCY, len(missing))) as pool:
+            fetched = dict(zip(missing, pool.map(_fetch_row, missing)))
+        with _cache_lock:
+            now = time.time()
+            for ticker, row in fetched.items():
+                if row is not None:
+                    rows[ticker] = {'fetched_at': now, 'row': row}
+            _save_cache(rows)
+
+    # A ticker that could not be fetched gets the defaults .info would have given
+    empty = parse_info({})
+    return {t: rows[t]['row'] if t in rows else empty for t in tickers}
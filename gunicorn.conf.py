@@ -0,0 +1,35 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# The master builds the dashboard frames once and publishes them as memory-mapped
+# files before any worker is forked; workers attach to them on import (see
+# shared_data.py) instead of each downloading and holding their own copy.
+# After that a publisher process (refresh.py) rebuilds and republishes them
+# periodically, and each worker's refresh thread swaps the new version in.
+
+_publisher = None
+
+def on_starting(server):
+    import dashboard_data
+    import shared_data
+    if not shared_data.shared_dir():
+        # Inherited by every worker forked from this master
+        os.environ['DASHBOARD_SHARED_DIR'] = tempfile.mkdtemp(prefix='dashboard-')
+    version = shared_data.publish(dashboard_data.build_frames())
+    server.log.info("Published dashboard data %s to %s", version, shared_data.shared_dir())
+
+
+def when_ready(server):
+    global _publisher
+    _publisher = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'refresh.py')])
+
+
+def on_exit(server):
+    if _publisher is not None:
+        _publisher.terminate()
+    directory = os.environ.get('DASHBOARD_SHARED_DIR', '')
+    if os.path.basename(directory).startswith('dashboard-'):
+        shutil.rmtree(directory, ignore_errors=True)
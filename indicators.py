@@ -0,0 +1,255 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Indicator series memoized by (dataset fingerprint, indicator, parameters).
+# compute_RSI, compute_MACD and the EMA lines in app2 all go through here, so
+# each series is computed once per dataset, and changing one parameter only
+# computes the series that depend on it.
+#
+# The classes at the end compute the same indicators incrementally, for live
+# bars: each keeps the state its indicator needs to take the next bar (the
+# current average, the last window of values), so a bar costs O(1) instead of
+# a pass over the whole series. Their state serializes to a JSON-able dict.
+
+CACHE_SIZE = int(os.environ.get('INDICATOR_CACHE_SIZE', 512))
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+hits = 0
+misses = 0
+
+
+def fingerprint(series):
+    """Digest of a series' index and values; equal data gives an equal fingerprint."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(series.index.asi8.tobytes() if hasattr(series.index, 'asi8') else series.index.values.tobytes())
+    digest.update(series.to_numpy(dtype='float64').tobytes())
+    return digest.hexdigest()
+
+
+def _memoized(key, compute):
+    global hits, misses
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            hits += 1
+            return _cache[key]
+    value = compute()
+    with _lock:
+        misses += 1
+        _cache[key] = value
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+def ema(close, span, fp=None):
+    fp = fp or fingerprint(close)
+    return _memoized((fp, 'ema', span), lambda: close.ewm(span=span, adjust=False).mean())
+
+
+def rsi(close, window=14, fp=None, wilder=False):
+    """RSI over simple moving averages of gains and losses, or Wilder's smoothed averages."""
+    fp = fp or fingerprint(close)
+
+    def compute():
+        delta = close.diff()
+        gain = delta.where(delta > 0, 0)
+        loss = -delta.where(delta < 0, 0)
+        if wilder:
+            gain = gain.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+            loss = loss.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+        else:
+            gain = gain.rolling(window=window).mean()
+            loss = loss.rolling(window=window).mean()
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+    return _memoized((fp, 'rsi_wilder' if wilder else 'rsi', window), compute)
+
+
+def macd(close, fast=12, slow=26, signal=9, fp=None):
+    """MACD line, signal line and histogram; the EMAs are shared with ema()."""
+    fp = fp or fingerprint(close)
+    macd_line = _memoized((fp, 'macd', fast, slow),
+                          lambda: ema(close, fast, fp) - ema(close, slow, fp))
+    signal_line = _memoized((fp, 'macd_signal', fast, slow, signal),
+                            lambda: macd_line.ewm(span=signal, adjust=False).mean())
+    histogram = _memoized((fp, 'macd_histogram', fast, slow, signal),
+                          lambda: macd_line - signal_line)
+    return macd_line, signal_line, histogram
+
+
+def _batch(values):
+    """values (one bar or a batch) as a float64 array, and whether it was one bar."""
+    return np.atleast_1d(np.asarray(values, dtype='float64')), np.ndim(values) == 0
+
+
+def _result(values, scalar):
+    return float(values[0]) if scalar else values
+
+
+def _floats(values):
+    """A JSON-able list of values, NaN as None."""
+    return [None if np.isnan(value) else value for value in np.asarray(values, dtype='float64').tolist()]
+
+
+def _nan(value):
+    return np.nan if value is None else value
+
+
+class EMA:
+    """Exponential moving average (ewm(adjust=False).mean()) of a stream.
+
+    The state is the current average and the missing values since the last
+    observation. Each batch is run through pandas' ewm seeded with that state,
+    which takes the same steps as the pass over the whole series.
+    """
+
+    def __init__(self, span=None, alpha=None, min_periods=0):
+        self.span = span
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.average = np.nan
+        self.gap = 0
+        self.count = 0
+
+    def update(self, values):
+        values, scalar = _batch(values)
+        if not len(values):
+            return values
+        seed = [] if np.isnan(self.average) else [self.average] + [np.nan] * self.gap
+        averages = pd.Series(np.concatenate([seed, values])).ewm(
+            span=self.span, alpha=self.alpha, adjust=False).mean().to_numpy()[len(seed):]
+
+        observed = ~np.isnan(values)
+        counts = self.count + np.cumsum(observed)
+        self.average = averages[-1]
+        self.gap = len(values) - 1 - np.flatnonzero(observed)[-1] if observed.any() else self.gap + len(values)
+        self.count = int(counts[-1])
+        return _result(np.where(counts >= max(self.min_periods, 1), averages, np.nan), scalar)
+
+    def state(self):
+        return {'kernel': 'EMA', 'span': self.span, 'alpha': self.alpha, 'min_periods': self.min_periods,
+                'average': _floats([self.average])[0], 'gap': int(self.gap), 'count': self.count}
+
+    @classmethod
+    def restore(cls, state):
+        kernel = cls(state['span'], state['alpha'], state['min_periods'])
+        kernel.average, kernel.gap, kernel.count = _nan(state['average']), state['gap'], state['count']
+        return kernel
+
+
+class _Rolling:
+    """A rolling-window statistic of a stream; the state is the last window - 1 values.
+
+    pandas carries its running sums across the whole series while this starts
+    them at each batch's window, so the two agree to rounding, not bit for bit.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.tail = np.array([], dtype='float64')
+
+    def update(self, values):
+        values, scalar = _batch(values)
+        series = pd.Series(np.concatenate([self.tail, values]))
+        result = self.statistic(series.rolling(window=self.window)).to_numpy()[len(self.tail):]
+        self.tail = series.to_numpy()[max(len(series) - self.window + 1, 0):]
+        return _result(result, scalar)
+
+    def state(self):
+        return {'kernel': type(self).__name__, 'window': self.window, 'tail': _floats(self.tail)}
+
+    @classmethod
+    def restore(cls, state):
+        kernel = cls(state['window'])
+        kernel.tail = np.array(state['tail'], dtype='float64')
+        return kernel
+
+
+class RollingMean(_Rolling):
+    """rolling(window).mean() of a stream."""
+
+    def statistic(self, rolling):
+        return rolling.mean()
+
+
+class RollingStd(_Rolling):
+    """rolling(window).std() of a stream, as process_data's rolling_std_7."""
+
+    def statistic(self, rolling):
+        return rolling.std()
+
+
+class RSI:
+    """rsi() of a stream of closes: the last close and the gain and loss averages."""
+
+    def __init__(self, window=14, wilder=False):
+        self.window = window
+        self.wilder = wilder
+        self.close = np.nan
+        if wilder:
+            self.gain = EMA(alpha=1 / window, min_periods=window)
+            self.loss = EMA(alpha=1 / window, min_periods=window)
+        else:
+            self.gain = RollingMean(window)
+            self.loss = RollingMean(window)
+
+    def update(self, values):
+        values, scalar = _batch(values)
+        if not len(values):
+            return values
+        delta = np.diff(values, prepend=self.close)
+        self.close = values[-1]
+        # As delta.where(): the first (missing) change counts as neither gain nor loss
+        gain = self.gain.update(np.where(delta > 0, delta, 0))
+        loss = self.loss.update(-np.where(delta < 0, delta, 0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return _result(100 - (100 / (1 + gain / loss)), scalar)
+
+    def state(self):
+        return {'kernel': 'RSI', 'window': self.window, 'wilder': self.wilder, 'close': _floats([self.close])[0],
+                'gain': self.gain.state(), 'loss': self.loss.state()}
+
+    @classmethod
+    def restore(cls, state):
+        kernel = cls(state['window'], state['wilder'])
+        kernel.close = _nan(state['close'])
+        kernel.gain, kernel.loss = restore(state['gain']), restore(state['loss'])
+        return kernel
+
+
+class MACD:
+    """macd() of a stream of closes: (MACD line, signal line, histogram) for each bar."""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(span=fast)
+        self.slow = EMA(span=slow)
+        self.signal = EMA(span=signal)
+
+    def update(self, values):
+        values, scalar = _batch(values)
+        macd_line = self.fast.update(values) - self.slow.update(values)
+        signal_line = self.signal.update(macd_line)
+        return tuple(_result(line, scalar) for line in (macd_line, signal_line, macd_line - signal_line))
+
+    def state(self):
+        return {'kernel': 'MACD', 'fast': self.fast.state(), 'slow': self.slow.state(), 'signal': self.signal.state()}
+
+    @classmethod
+    def restore(cls, state):
+        kernel = cls()
+        kernel.fast, kernel.slow, kernel.signal = (restore(state[name]) for name in ('fast', 'slow', 'signal'))
+        return kernel
+
+
+KERNELS = {kernel.__name__: kernel for kernel in (EMA, RollingMean, RollingStd, RSI, MACD)}
+
+
+def restore(state):
+    """The streaming indicator a state() dict was taken from."""
+    return KERNELS[state['kernel']].restore(state)
@@ -0,0 +1,224 @@
+import bisect
+import cProfile
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+import flask
+from dash.exceptions import PreventUpdate
+import providers
+
+# Request-path metrics for the dashboards, served in Prometheus text format on
+# /metrics. install(app) wraps every Dash callback (latency, exceptions, JSON
+# payload bytes) and the market-data provider (latency and exceptions per
+# call); caches report their hit and miss counts when scraped. Metrics are per
+# process, so under gunicorn each worker reports its own.
+#
+# Setting PROFILE_SAMPLE_RATE runs that fraction of callbacks under cProfile and
+# keeps the profile of any that took longer than SLOW_CALLBACK_SECONDS.
+
+SLOW_CALLBACK_SECONDS = float(os.environ.get('SLOW_CALLBACK_SECONDS', 1.0))
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_DIR = os.environ.get('PROFILE_DIR',
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+PAYLOAD_BUCKETS = [1e3, 1e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7]
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ['+Inf'], self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(labels, le=bound)} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {self.sum}')
+        lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+        return lines
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# name -> (type, help); series are keyed by (name, label pairs)
+_METRICS = {
+    'dashboard_callback_seconds': ('histogram', 'Dash callback latency in seconds.'),
+    'dashboard_callback_payload_bytes': ('histogram', 'Size of the JSON a Dash callback returned.'),
+    'dashboard_callback_exceptions_total': ('counter', 'Dash callbacks that raised, by exception type.'),
+    'dashboard_callback_slow_total': ('counter', 'Dash callbacks slower than SLOW_CALLBACK_SECONDS.'),
+    'dashboard_provider_seconds': ('histogram', 'Market-data provider call latency in seconds.'),
+    'dashboard_provider_exceptions_total': ('counter', 'Market-data provider calls that raised, by exception type.'),
+    'dashboard_cache_hits_total': ('counter', 'Lookups served from a cache.'),
+    'dashboard_cache_misses_total': ('counter', 'Lookups a cache had to compute or fetch.'),
+    'dashboard_cache_hit_ratio': ('gauge', 'Hits over lookups for a cache.'),
+}
+_BUCKETS = {'dashboard_callback_seconds': LATENCY_BUCKETS,
+            'dashboard_callback_payload_bytes': PAYLOAD_BUCKETS,
+            'dashboard_provider_seconds': LATENCY_BUCKETS}
+
+_series = defaultdict(dict)
+_lock = threading.Lock()
+_caches = {}
+_profile_lock = threading.Lock()
+
+
+def observe(name, value, **labels):
+    key = tuple(sorted(labels.items()))
+    with _lock:
+        series = _series[name]
+        if key not in series:
+            series[key] = Histogram(_BUCKETS[name])
+        series[key].observe(value)
+
+
+def increment(name, **labels):
+    key = tuple(sorted(labels.items()))
+    with _lock:
+        series = _series[name]
+        series[key] = series.get(key, 0) + 1
+
+
+def register_cache(name, counts):
+    """Report a cache on /metrics; counts() returns its (hits, misses) so far."""
+    _caches[name] = counts
+
+
+def render():
+    """Every metric in Prometheus text exposition format."""
+    with _lock:
+        values = {name: {labels: value if isinstance(value, int) else value.lines(name, labels)
+                         for labels, value in series.items()}
+                  for name, series in _series.items()}
+    for cache, counts in _caches.items():
+        hits, misses = counts()
+        labels = (('cache', cache),)
+        values.setdefault('dashboard_cache_hits_total', {})[labels] = hits
+        values.setdefault('dashboard_cache_misses_total', {})[labels] = misses
+        values.setdefault('dashboard_cache_hit_ratio', {})[labels] = hits / (hits + misses) if hits + misses else 0.0
+
+    lines = []
+    for name, (kind, description) in _METRICS.items():
+        series = values.get(name)
+        if not series:
+            continue
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+        for labels, value in sorted(series.items()):
+            # Histograms were rendered to their lines above, while holding the lock
+            if isinstance(value, list):
+                lines += value
+            else:
+                lines.append(f'{name}{_labels(labels)} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def _dump_profile(profile, name):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile.dump_stats(os.path.join(PROFILE_DIR, f'{name}-{int(time.time() * 1000)}-{os.getpid()}.prof'))
+
+
+def _instrument_callback(name, func):
+    def instrumented(*args, **kwargs):
+        # At most one callback is profiled at a time, so a dump only holds that callback's work
+        profile = None
+        if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE and _profile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            if profile is not None:
+                profile.enable()
+            response = func(*args, **kwargs)
+        except PreventUpdate:
+            raise
+        except Exception as e:
+            increment('dashboard_callback_exceptions_total', callback=name, exception=type(e).__name__)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            observe('dashboard_callback_seconds', elapsed, callback=name)
+            if elapsed > SLOW_CALLBACK_SECONDS:
+                increment('dashboard_callback_slow_total', callback=name)
+            if profile is not None:
+                profile.disable()
+                if elapsed > SLOW_CALLBACK_SECONDS:
+                    _dump_profile(profile, name)
+                _profile_lock.release()
+        # Dash's wrapper returns the serialized response, which is what goes over the wire
+        observe('dashboard_callback_payload_bytes', len(response), callback=name)
+        return response
+    instrumented.__name__ = name
+    instrumented.__wrapped__ = func
+    instrumented.instrumented = True
+    return instrumented
+
+
+class InstrumentedProvider(providers.MarketDataProvider):
+    """Times every call to the wrapped provider; its name is the inner one, so store paths do not change."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.name = inner.name
+
+    def _call(self, method, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return getattr(self.inner, method)(*args, **kwargs)
+        except Exception as e:
+            increment('dashboard_provider_exceptions_total', provider=self.name, method=method,
+                      exception=type(e).__name__)
+            raise
+        finally:
+            observe('dashboard_provider_seconds', time.perf_counter() - started, provider=self.name, method=method)
+
+    def history(self, symbol, start=None, end=None, interval='1d', auto_adjust=True, actions=True):
+        return self._call('history', symbol, start=start, end=end, interval=interval,
+                          auto_adjust=auto_adjust, actions=actions)
+
+    def info(self, symbol):
+        return self._call('info', symbol)
+
+    def download(self, tickers, period=None, start=None, end=None, interval='1d'):
+        return self._call('download', tickers, period=period, start=start, end=end, interval=interval)
+
+    def history_many(self, symbols, start=None, end=None, interval='1d'):
+        return self._call('history_many', symbols, start=start, end=end, interval=interval)
+
+
+def instrument_provider():
+    """Time calls to the current provider; call before anything fetches, so startup fetches are measured too."""
+    provider = providers.get_provider()
+    if not isinstance(provider, InstrumentedProvider):
+        providers.set_provider(InstrumentedProvider(provider))
+
+
+def install(app):
+    """Instrument app's callbacks and the current provider, and serve GET /metrics on app's server."""
+    for callback in app.callback_map.values():
+        # Clientside callbacks run in the browser and have no Python function
+        func = callback.get('callback')
+        if func is not None and not getattr(func, 'instrumented', False):
+            callback['callback'] = _instrument_callback(func.__name__, func)
+
+    instrument_provider()
+
+    if 'metrics' not in app.server.view_functions:
+        app.server.add_url_rule('/metrics', 'metrics',
+                                lambda: flask.Response(render(), mimetype='text/plain; version=0.0.4'))
@@ -0,0 +1,218 @@
+import math
+import os
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+import indicators
+import providers
+from shared_cache import SharedCache
+
+# Live mode: a dcc.Interval polls for the bars that arrived since the last poll
+# and the graphs append them with extendData, so an update costs the new bars
+# rather than a re-rendered figure. When a graph is (re)drawn in live mode it
+# records a cursor for its session: the feed streams it was drawn from and the
+# last bar it holds. Each poll then sends only the bars after that cursor.
+# Indicators drawn over the history are extended by streaming kernels
+# (indicators.EMA, RSI, MACD) whose serialized state is kept with the cursor,
+# so a poll costs the new bars however long the history is.
+#
+# Cursors and the streams they follow are kept in the cache shared by every
+# worker on the host (shared_cache.py), so a poll may reach any worker.
+#
+# Bars come from a feed. SimulatedFeed continues a symbol's history with a
+# random walk, one bar every LIVE_BAR_SECONDS, so live mode can be exercised
+# without a market-data push channel.
+
+# Milliseconds between polls from the browser
+INTERVAL_MS = int(os.environ.get('LIVE_INTERVAL_MS', 2000))
+# Wall-clock seconds per simulated bar
+BAR_SECONDS = float(os.environ.get('LIVE_BAR_SECONDS', 2))
+# Streams whose generated bars a process keeps; a dropped one is generated again when next polled
+MAX_STREAMS = int(os.environ.get('LIVE_MAX_STREAMS', 256))
+# Bars a simulated stream produces at most (daily bars would otherwise run past pandas' last date)
+MAX_STREAM_BARS = int(os.environ.get('LIVE_MAX_STREAM_BARS', 10_000))
+# Bars generated per seed: every worker generating a stream draws the same blocks
+BLOCK_BARS = 256
+
+# Columns of a live bar, as in store.history frames
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def session_state(enabled, state):
+    """The 'live' store of a page: its session id (kept once assigned) and whether live mode is on."""
+    session = (state or {}).get('session') or uuid.uuid4().hex
+    return {'session': session, 'enabled': bool(enabled)}
+
+
+def is_live(state):
+    return bool(state and state.get('enabled') and state.get('session'))
+
+
+def timestamps(index):
+    """x values for extendData, in the ISO format plotly.py writes dates in."""
+    return [ts.isoformat() for ts in index]
+
+
+def append(history, bars):
+    """history's OHLCV columns followed by bars."""
+    if not len(bars):
+        return history[COLUMNS]
+    return pd.concat([history[COLUMNS], bars[COLUMNS]])
+
+
+class SimulatedFeed:
+    """Bars continuing each symbol's history, as if a quote feed delivered one every bar_seconds.
+
+    A stream is described by a spec (symbol, the last bar of the history it
+    continues, when it was opened, the walk's parameters), which is all that
+    workers share: its bars are generated in blocks of BLOCK_BARS, each from a
+    seed derived from the symbol, the anchor and the block, so every worker
+    produces the same bars for the same spec.
+    """
+
+    def __init__(self, bar_seconds=BAR_SECONDS, seed=0, clock=time.time):
+        self.bar_seconds = bar_seconds
+        self.seed = seed
+        self.clock = clock
+        self._generated = OrderedDict()
+        self._lock = threading.Lock()
+
+    def spec(self, symbol, history, opened=None):
+        """The spec of a stream continuing history (bars of symbol with a Close column), opened now by default."""
+        close = history['Close'].to_numpy(dtype='float64')[-101:]
+        returns = np.diff(np.log(close))
+        returns = returns[np.isfinite(returns)]
+        volume = history['Volume'].to_numpy(dtype='float64')[-100:] if 'Volume' in history else []
+        step = history.index[-1] - history.index[-2] if len(history) > 1 else pd.Timedelta(days=1)
+        return {
+            'symbol': symbol,
+            'anchor': history.index[-1],
+            'index_name': history.index.name,
+            'opened': self.clock() if opened is None else opened,
+            'close': float(close[-1]),
+            'volatility': float(returns.std()) if len(returns) > 1 else 0.02,
+            'volume': float(np.nanmedian(volume)) if len(volume) else 5e7,
+            # Daily bars continue on business days, so weekend rangebreaks hide nothing
+            'freq': 'B' if step >= pd.Timedelta(days=1) else to_offset(step).freqstr,
+        }
+
+    def count(self, spec, now=None):
+        """Bars the stream has produced by now."""
+        now = self.clock() if now is None else now
+        return max(0, min(int((now - spec['opened']) / self.bar_seconds), MAX_STREAM_BARS))
+
+    def bars(self, spec, since=None, now=None):
+        """The stream's bars up to now, or only those after since."""
+        count = self.count(spec, now)
+        # Everything but when it was opened decides the bars themselves
+        key = tuple(value for name, value in sorted(spec.items()) if name != 'opened')
+        with self._lock:
+            bars = self._generated.get(key)
+            if bars is None or len(bars) < count:
+                bars = self._generated[key] = self._generate(spec, bars, count)
+            self._generated.move_to_end(key)
+            while len(self._generated) > MAX_STREAMS:
+                self._generated.popitem(last=False)
+        bars = bars.iloc[:count]
+        if since is None:
+            return bars
+        return bars.iloc[bars.index.searchsorted(since, side='right'):]
+
+    def _generate(self, spec, bars, count):
+        """bars extended by whole blocks until they hold count bars."""
+        have = 0 if bars is None else len(bars)
+        close = spec['close'] if not have else bars['Close'].iloc[-1]
+        stream = zlib.crc32(f"{spec['symbol']}|{spec['anchor']}".encode())
+        blocks = [] if not have else [bars]
+        for block in range(have // BLOCK_BARS, math.ceil(count / BLOCK_BARS)):
+            rng = np.random.default_rng([self.seed, stream, block])
+            new = providers.synthetic_bars(BLOCK_BARS, rng, start_price=close, volatility=spec['volatility'],
+                                           volume=spec['volume'])
+            close = new['Close'][-1]
+            blocks.append(pd.DataFrame({column: new[column] for column in COLUMNS}))
+        if not blocks:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name=spec['index_name']), dtype='float64')
+        offset = to_offset(spec['freq'])
+        generated = pd.concat([block.reset_index(drop=True) for block in blocks], ignore_index=True)
+        generated.index = pd.date_range(spec['anchor'] + offset, periods=len(generated), freq=offset,
+                                        name=spec['index_name'])
+        return generated
+
+
+# One feed per process; streams and cursors are shared (see above)
+feed = SimulatedFeed()
+shared = SharedCache('live')
+
+
+def open_stream(symbol, history, now):
+    """The spec of the stream continuing history: the one already open in any worker, or one opened now."""
+    spec = feed.spec(symbol, history, now)
+    return shared.get(('stream', symbol, spec['anchor']), lambda: spec)
+
+
+def draw(state, graphs, histories):
+    """Live bars so far for graphs being drawn in live mode, with their cursors recorded.
+
+    histories maps a name to (symbol, history); the result maps it to the
+    bars that followed that history. graphs that are extended separately
+    (one extendData per set of trace attributes) each get a cursor at the
+    same bar.
+    """
+    now = feed.clock()
+    streams = {name: open_stream(symbol, history, now) for name, (symbol, history) in histories.items()}
+    bars = {name: feed.bars(spec, now=now) for name, spec in streams.items()}
+    last = max((b.index[-1] for b in bars.values() if len(b)), default=None)
+    for graph in graphs:
+        shared.store((state['session'], graph), (streams, last, {}))
+    return bars
+
+
+def keep(state, graph, history, **kernels):
+    """Run streaming indicators over history's closes and keep their state in graph's cursor for its polls."""
+    if not is_live(state):
+        return
+    cursor = shared.lookup((state['session'], graph), None)
+    if cursor is None:
+        return
+    close = history['Close'].to_numpy(dtype='float64')
+    for kernel in kernels.values():
+        kernel.update(close)
+    streams, last, kept = cursor
+    shared.store((state['session'], graph),
+                 (streams, last, dict(kept, **{name: kernel.state() for name, kernel in kernels.items()})))
+
+
+def forget(state, graphs):
+    """Stop extending graphs redrawn without live traces."""
+    if state and state.get('session'):
+        for graph in graphs:
+            shared.store((state['session'], graph), None)
+
+
+def poll(state, graph, extend):
+    """extend(bars of each stream after the graph's cursor, kernels), moving the cursor past them; None if no new bars.
+
+    kernels are the graph's streaming indicators, restored from the cursor;
+    extend feeds them the new bars and their state is kept for the next poll.
+    """
+    if not is_live(state):
+        return None
+    cursor = shared.lookup((state['session'], graph), None)
+    if cursor is None:
+        return None
+    streams, last, kept = cursor
+    now = feed.clock()
+    bars = {name: feed.bars(spec, since=last, now=now) for name, spec in streams.items()}
+    new_last = max((b.index[-1] for b in bars.values() if len(b)), default=None)
+    if new_last is None:
+        return None
+    kernels = {name: indicators.restore(kernel) for name, kernel in kept.items()}
+    update = extend(bars, kernels)
+    shared.store((state['session'], graph),
+                 (streams, new_last, {name: kernel.state() for name, kernel in kernels.items()}))
+    return update
@@ -0,0 +1,328 @@
+import json
+import os
+import zlib
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# Market-data providers. Every fetch in the dashboards goes through the
+# provider returned by get_provider(), selected with MARKET_DATA_PROVIDER:
+#   yfinance  - live data from Yahoo Finance (default)
+#   record    - live data, with every response also written to MARKET_DATA_RECORD_DIR
+#   replay    - responses recorded earlier, synthetic data for anything not recorded
+#   synthetic - deterministic generated data, no network at all
+# replay and synthetic return the same frame shapes as yfinance, so the
+# dashboards can be load-tested and benchmarked offline.
+
+RECORD_DIR = os.environ.get('MARKET_DATA_RECORD_DIR',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recordings'))
+
+HISTORY_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume', 'Dividends', 'Stock Splits']
+DOWNLOAD_COLUMNS = ['Adj Close', 'Close', 'High', 'Low', 'Open', 'Volume']
+
+_INTRADAY = {'1m': '1min', '2m': '2min', '5m': '5min', '15m': '15min', '30m': '30min',
+             '60m': '60min', '90m': '90min', '1h': '60min'}
+_DAILY = {'1wk': 'W-MON', '1mo': 'MS', '3mo': 'QS'}
+
+
+def _period_start(period):
+    # Imported lazily: store imports this module
+    import store
+    return store.period_start(period)
+
+
+def _slice(bars, start, end):
+    index = bars.index.tz_localize(None) if bars.index.tz is not None else bars.index
+    mask = np.ones(len(bars), dtype=bool)
+    if start is not None:
+        mask &= index >= pd.Timestamp(start)
+    if end is not None:
+        mask &= index < pd.Timestamp(end)
+    return bars[mask]
+
+
+def _adjust(bars):
+    ratio = bars['Adj Close'] / bars['Close']
+    bars = bars.copy()
+    for column in ['Open', 'High', 'Low']:
+        bars[column] = bars[column] * ratio
+    bars['Close'] = bars['Adj Close']
+    return bars.drop(columns='Adj Close')
+
+
+class MarketDataProvider:
+    """Interface every provider implements; frames match what yfinance returns."""
+
+    name = 'base'
+
+    def history(self, symbol, start=None, end=None, interval='1d', auto_adjust=True, actions=True):
+        """Like yf.Ticker(symbol).history(start=start, end=end, interval=interval, ...)."""
+        raise NotImplementedError
+
+    def info(self, symbol):
+        """Like yf.Ticker(symbol).info."""
+        raise NotImplementedError
+
+    def history_many(self, symbols, start=None, end=None, interval='1d'):
+        """{symbol: unadjusted history with actions} for several symbols; one request where the source allows."""
+        return {symbol: self.history(symbol, start=start, end=end, interval=interval, auto_adjust=False, actions=True)
+                for symbol in symbols}
+
+    def download(self, tickers, period=None, start=None, end=None, interval='1d'):
+        """Like yf.download(tickers, ...): (Price, Ticker) MultiIndex columns, naive index."""
+        single = isinstance(tickers, str)
+        tickers = tickers.split() if single else list(tickers)
+        if period is not None:
+            start = _period_start(period)
+        frames = {}
+        for ticker in tickers:
+            bars = self.history(ticker, start=start, end=end, interval=interval, auto_adjust=False)
+            if bars.index.tz is not None:
+                bars.index = bars.index.tz_localize(None)
+            frames[ticker] = bars.reindex(columns=DOWNLOAD_COLUMNS)
+        if single and len(tickers) == 1:
+            return frames[tickers[0]]
+        data = pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
+        data.columns.names = ['Price', 'Ticker']
+        data.index.name = 'Date'
+        return data
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = 'yfinance'
+
+    def history(self, symbol, start=None, end=None, interval='1d', auto_adjust=True, actions=True):
+        return yf.Ticker(symbol).history(start=start, end=end, interval=interval,
+                                         auto_adjust=auto_adjust, actions=actions)
+
+    def info(self, symbol):
+        return yf.Ticker(symbol).info
+
+    def download(self, tickers, period=None, start=None, end=None, interval='1d'):
+        return yf.download(tickers, period=period, start=start, end=end, interval=interval, progress=False)
+
+    def history_many(self, symbols, start=None, end=None, interval='1d'):
+        # One bulk request (yfinance threads it) instead of a Ticker.history call per symbol
+        data = yf.download(list(symbols), start=start, end=end, interval=interval, auto_adjust=False,
+                           actions=True, group_by='ticker', threads=True, progress=False)
+        if data.columns.nlevels == 1:
+            return {symbols[0]: data}
+        level = 0 if symbols[0] in data.columns.get_level_values(0) else 1
+        tickers = set(data.columns.get_level_values(level))
+        return {symbol: data.xs(symbol, axis=1, level=level).dropna(how='all')
+                for symbol in symbols if symbol in tickers}
+
+
+class SyntheticProvider(MarketDataProvider):
+    """Deterministic random-walk prices: the same symbol and date always give the same bar."""
+
+    name = 'synthetic'
+    # Every daily path starts here, so a bar does not depend on the requested range
+    EPOCH = pd.Timestamp('2000-01-03')
+
+    def __init__(self, seed=0):
+        self.seed = seed
+
+    def _rng(self, *key):
+        return np.random.default_rng([self.seed, zlib.crc32('|'.join(map(str, key)).encode())])
+
+    def _daily(self, symbol, end):
+        end = pd.Timestamp(end) if end is not None else pd.Timestamp.now().normalize() + pd.Timedelta(days=1)
+        freq = 'D' if symbol.endswith('-USD') else 'B'
+        index = pd.date_range(self.EPOCH, end - pd.Timedelta(days=1), freq=freq, name='Date')
+        rng = self._rng(symbol, '1d')
+        start_price = 10 ** rng.uniform(0, 3)
+        bars = synthetic_bars(len(index), rng, start_price=start_price)
+        return pd.DataFrame(bars, index=index)
+
+    def _intraday(self, symbol, start, end, interval):
+        start = pd.Timestamp(start).normalize() if start is not None else pd.Timestamp.now().normalize()
+        daily = self._daily(symbol, end)
+        daily = daily[daily.index >= start]
+        frames = []
+        for day, row in daily.iterrows():
+            if symbol.endswith('-USD'):
+                index = pd.date_range(day, day + pd.Timedelta(days=1), freq=_INTRADAY[interval], inclusive='left')
+            else:
+                index = pd.date_range(day + pd.Timedelta(hours=9, minutes=30), day + pd.Timedelta(hours=16),
+                                      freq=_INTRADAY[interval], inclusive='left')
+            rng = self._rng(symbol, interval, day.date())
+            bars = synthetic_bars(len(index), rng, start_price=row['Open'], volatility=0.002,
+                                  volume=row['Volume'] / len(index))
+            frames.append(pd.DataFrame(bars, index=index))
+        if not frames:
+            return pd.DataFrame(columns=HISTORY_COLUMNS, index=pd.DatetimeIndex([], name='Datetime'))
+        bars = pd.concat(frames)
+        bars.index.name = 'Datetime'
+        return bars
+
+    def history(self, symbol, start=None, end=None, interval='1d', auto_adjust=True, actions=True):
+        if interval in _INTRADAY:
+            bars = self._intraday(symbol, start, end, interval)
+        else:
+            bars = self._daily(symbol, end)
+            if interval in _DAILY:
+                bars = resample_ohlcv(bars, _DAILY[interval])
+        bars = _slice(bars, start, end)
+        tz = 'UTC' if symbol.endswith('-USD') else 'America/New_York'
+        bars.index = bars.index.tz_localize(tz)
+        if auto_adjust:
+            bars = _adjust(bars)
+        if not actions:
+            bars = bars.drop(columns=['Dividends', 'Stock Splits'])
+        return bars
+
+    def info(self, symbol):
+        rng = self._rng(symbol, 'info')
+        close = self._daily(symbol, None)['Close']
+        last_year = close.iloc[-252:]
+        shares = 10 ** rng.uniform(8, 10)
+        eps = close.iloc[-1] / rng.uniform(8, 60)
+        return {
+            'symbol': symbol,
+            'longName': f"{symbol} Synthetic Inc.",
+            'marketCap': int(close.iloc[-1] * shares),
+            'trailingPE': close.iloc[-1] / eps,
+            'forwardPE': close.iloc[-1] / (eps * rng.uniform(0.9, 1.3)),
+            'volume': int(rng.uniform(1e6, 1e8)),
+            'averageVolume': int(rng.uniform(1e6, 1e8)),
+            'trailingEps': eps,
+            'fiftyTwoWeekHigh': last_year.max(),
+            'fiftyTwoWeekLow': last_year.min(),
+            'revenueGrowth': rng.normal(0.08, 0.1),
+            'earningsGrowth': rng.normal(0.1, 0.2),
+            'profitMargins': rng.uniform(-0.1, 0.4),
+            'targetMeanPrice': close.iloc[-1] * rng.uniform(0.9, 1.3),
+            'beta': rng.uniform(0.5, 2.0),
+        }
+
+
+class RecordingProvider(MarketDataProvider):
+    """Passes calls to another provider and keeps every response on disk for ReplayProvider."""
+
+    def __init__(self, inner, directory=RECORD_DIR):
+        self.inner = inner
+        self.directory = directory
+        self.name = inner.name
+
+    def history(self, symbol, start=None, end=None, interval='1d', auto_adjust=True, actions=True):
+        # Record the raw bars; adjustment is applied on the way out, like yfinance does
+        bars = self.inner.history(symbol, start=start, end=end, interval=interval,
+                                  auto_adjust=False, actions=True)
+        if not bars.empty:
+            path = _recording_path(self.directory, 'history', interval, symbol, 'parquet')
+            if os.path.exists(path):
+                recorded = pd.read_parquet(path)
+                bars = pd.concat([recorded, bars])
+                bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+            _atomic_write(path, lambda tmp: bars.to_parquet(tmp))
+        bars = _slice(bars, start, end)
+        if auto_adjust:
+            bars = _adjust(bars)
+        if not actions:
+            bars = bars.drop(columns=['Dividends', 'Stock Splits'])
+        return bars
+
+    def info(self, symbol):
+        info = self.inner.info(symbol)
+        path = _recording_path(self.directory, 'info', '', symbol, 'json')
+
+        def write(tmp):
+            with open(tmp, 'w') as f:
+                json.dump(info, f, default=str)
+        _atomic_write(path, write)
+        return info
+
+
+class ReplayProvider(MarketDataProvider):
+    """Serves responses captured by RecordingProvider; anything missing comes from the fallback."""
+
+    name = 'replay'
+
+    def __init__(self, directory=RECORD_DIR, fallback=None):
+        self.directory = directory
+        self.fallback = fallback if fallback is not None else SyntheticProvider()
+
+    def history(self, symbol, start=None, end=None, interval='1d', auto_adjust=True, actions=True):
+        path = _recording_path(self.directory, 'history', interval, symbol, 'parquet')
+        if not os.path.exists(path):
+            return self.fallback.history(symbol, start=start, end=end, interval=interval,
+                                         auto_adjust=auto_adjust, actions=actions)
+        bars = _slice(pd.read_parquet(path), start, end)
+        if auto_adjust:
+            bars = _adjust(bars)
+        if not actions:
+            bars = bars.drop(columns=['Dividends', 'Stock Splits'])
+        return bars
+
+    def info(self, symbol):
+        path = _recording_path(self.directory, 'info', '', symbol, 'json')
+        if not os.path.exists(path):
+            return self.fallback.info(symbol)
+        with open(path) as f:
+            return json.load(f)
+
+
+def _recording_path(directory, kind, interval, symbol, extension):
+    return os.path.join(directory, kind, interval, f"{symbol.replace('/', '_')}.{extension}")
+
+
+def _atomic_write(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def synthetic_bars(n, rng, start_price=100.0, volatility=0.02, volume=5e7):
+    """n OHLCV bars from a geometric random walk, as a dict of float64 arrays."""
+    returns = rng.normal(0.0003, volatility, n)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([start_price], close[:-1])) * np.exp(rng.normal(0, volatility / 4, n))
+    spread = np.abs(rng.normal(0, volatility / 2, (2, n)))
+    high = np.maximum(open_, close) * (1 + spread[0])
+    low = np.minimum(open_, close) * (1 - spread[1])
+    return {
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Adj Close': close,
+        'Volume': np.round(volume * rng.lognormal(0, 0.4, n)),
+        'Dividends': np.zeros(n),
+        'Stock Splits': np.zeros(n),
+    }
+
+
+def resample_ohlcv(bars, rule):
+    """Aggregate OHLCV bars to a coarser rule with first/max/min/last/sum."""
+    aggregated = bars.resample(rule, label='left', closed='left').agg({
+        'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+        'Adj Close': 'last', 'Volume': 'sum', 'Dividends': 'sum', 'Stock Splits': 'sum',
+    })
+    return aggregated.dropna(subset=['Close'])
+
+
+_provider = None
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        mode = os.environ.get('MARKET_DATA_PROVIDER', 'yfinance')
+        if mode == 'yfinance':
+            _provider = YFinanceProvider()
+        elif mode == 'record':
+            _provider = RecordingProvider(YFinanceProvider())
+        elif mode == 'replay':
+            _provider = ReplayProvider()
+        elif mode == 'synthetic':
+            _provider = SyntheticProvider(seed=int(os.environ.get('MARKET_DATA_SEED', 0)))
+        else:
+            raise ValueError(f"Unknown MARKET_DATA_PROVIDER: {mode}")
+    return _provider
+
+
+def set_provider(provider):
+    global _provider
+    _provider = provider
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+
+# In-memory cache of price history keyed by (symbol, interval), aware of the
+# date range each entry covers. A request inside a cached range is answered by
+# slicing; a request overlapping it only fetches the missing edges and merges
+# them in. Entries are evicted least-recently-used once their total size
+# exceeds max_bytes.
+
+MAX_BYTES = int(os.environ.get('RANGE_CACHE_BYTES', 256 * 1024 * 1024))
+# Seconds before the newest edge of an entry is asked for again
+MAX_AGE = float(os.environ.get('RANGE_CACHE_MAX_AGE', 15 * 60))
+
+
+def _merge(*frames):
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return None
+    if len(frames) == 1:
+        return frames[0]
+    data = pd.concat(frames)
+    return data[~data.index.duplicated(keep='last')].sort_index()
+
+
+class RangeCache:
+    def __init__(self, fetch, max_bytes=MAX_BYTES, max_age=MAX_AGE):
+        # fetch(symbol, start, end, interval) -> frame of bars in [start, end)
+        self.fetch = fetch
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (symbol, interval) -> [start, end, data, nbytes, fetched_at]
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def get(self, symbol, start, end, interval='1d'):
+        """Bars for symbol in [start, end), fetching only what the cache does not cover."""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        key = (symbol, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry = list(entry)
+
+        now = time.time()
+        if entry is None or end <= entry[0] or start >= entry[1]:
+            # Nothing cached, or no overlap: fetch the whole range and replace the entry
+            self.misses += 1
+            cached_start, cached_end, data, fetched_at = start, end, self.fetch(symbol, start, end, interval), now
+        else:
+            cached_start, cached_end, data, _, fetched_at = entry
+            left = right = None
+            if start < cached_start:
+                left = self.fetch(symbol, start, cached_start, interval)
+                cached_start = start
+            # Bars from the day of the last fetch onwards may have changed or appeared since
+            stale_from = min(cached_end, pd.Timestamp(fetched_at, unit='s').normalize())
+            expired = now - fetched_at > self.max_age and end > stale_from
+            if end > cached_end or expired:
+                right = self.fetch(symbol, stale_from if expired else cached_end, max(end, cached_end), interval)
+                cached_end = max(end, cached_end)
+                if expired:
+                    fetched_at = now
+            if left is None and right is None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                data = _merge(data, left, right)
+
+        if data is None or data.empty:
+            return pd.DataFrame() if data is None else data
+
+        nbytes = int(data.memory_usage(deep=True).sum())
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[3]
+            self._entries[key] = (cached_start, cached_end, data, nbytes, fetched_at)
+            self._bytes += nbytes
+            # Keep the entry just stored even if it alone exceeds the budget
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[3]
+
+        # Callers add columns to what they get back; never hand out the cached frame itself
+        return data[(data.index >= start) & (data.index < end)].copy()
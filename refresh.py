@@ -0,0 +1,138 @@
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+import numpy as np
+import dashboard_data
+import shared_data
+import store
+import summary_table
+
+# Keeps the summary data fresh without touching the request path. A background
+# thread rebuilds (or, under gunicorn, re-attaches to what the publisher process
+# built) and swaps in a new immutable Snapshot with a single assignment, so
+# callbacks never block on a fetch or see a half-built state.
+
+# Seconds between rebuilds; the store will not ask for newer bars any sooner
+REFRESH_INTERVAL = float(os.environ.get('DASHBOARD_REFRESH_INTERVAL', store.MAX_AGE))
+# Seconds between checks for a newly published version (workers only)
+POLL_INTERVAL = float(os.environ.get('DASHBOARD_POLL_INTERVAL', 5))
+
+# Rows in the bullish and bearish tables
+MOVERS_COUNT = int(os.environ.get('DASHBOARD_MOVERS_COUNT', 50))
+
+Snapshot = namedtuple('Snapshot', ['version', 'built_at', 'frames', 'pct_change',
+                                   'bullish_stocks', 'bearish_stocks', 'top_growth_stocks',
+                                   'partitions', 'tables'])
+
+_snapshot = None
+_thread = None
+
+
+def movers(change, n, largest=True):
+    """The n largest (or smallest) values of change, in that order.
+
+    np.argpartition finds them in linear time; only those n are then sorted,
+    so ranking a universe of thousands does not sort all of it.
+    """
+    values = change.to_numpy(dtype='float64')
+    valid = np.flatnonzero(~np.isnan(values))
+    n = min(n, len(valid))
+    if n == 0:
+        return change.iloc[:0]
+    key = -values[valid] if largest else values[valid]
+    chosen = np.argpartition(key, n - 1)[:n]
+    chosen = chosen[np.argsort(key[chosen], kind='stable')]
+    return change.iloc[valid[chosen]]
+
+
+def build_snapshot(frames, version=None, built_at=None):
+    all_data = frames['all_data']
+
+    # Calculate percentage change for the last day
+    pct_change = all_data['Close'].pct_change(fill_method=None).iloc[-1] * 100
+
+    # Movers are ranked among equities; cryptocurrencies have their own table
+    is_crypto = pct_change.index.isin(dashboard_data.crypto_tickers)
+    equities = pct_change[~is_crypto]
+
+    # Identify bullish and bearish stocks: the biggest gains and the biggest losses
+    bullish_stocks = movers(equities[equities > 0], MOVERS_COUNT)
+    bearish_stocks = movers(equities[equities < 0], MOVERS_COUNT, largest=False)
+
+    # Select top 10 growth stocks
+    top_growth_stocks = movers(equities, 10)
+
+    # Indexed once here, so the summary tables page, sort and filter without re-ranking
+    partitions = {'equity': summary_table.Partition(equities), 'crypto': summary_table.Partition(pct_change[is_crypto])}
+    tables = {
+        'bullish': partitions['equity'].table('Bullish Stocks', 'equity', bullish_stocks),
+        'bearish': partitions['equity'].table('Bearish Stocks', 'equity', bearish_stocks),
+        'top10': partitions['equity'].table('Top 10 Growth Stocks', 'equity', top_growth_stocks),
+        'crypto': partitions['crypto'].table('Cryptocurrencies', 'crypto', pct_change[is_crypto]),
+    }
+
+    return Snapshot(version, built_at if built_at is not None else time.time(), MappingProxyType(dict(frames)),
+                    pct_change, bullish_stocks, bearish_stocks, top_growth_stocks, partitions, tables)
+
+
+def _load():
+    version = shared_data.current_version()
+    if version is not None:
+        return build_snapshot(shared_data.attach(version), version, shared_data.published_at(version))
+    return build_snapshot(dashboard_data.build_frames())
+
+
+def current():
+    """The live snapshot; built on first use if the scheduler has not run yet."""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = _load()
+    return _snapshot
+
+
+def age():
+    """Seconds since the live snapshot's data was built."""
+    return time.time() - current().built_at
+
+
+def _run():
+    global _snapshot
+    while True:
+        if shared_data.shared_dir():
+            time.sleep(POLL_INTERVAL)
+            if shared_data.current_version() == current().version:
+                continue
+        else:
+            time.sleep(REFRESH_INTERVAL)
+        try:
+            _snapshot = _load()
+        except Exception as e:
+            # Keep serving the previous snapshot; age() shows how far behind it is
+            print(f"Error refreshing dashboard data: {e}")
+
+
+def start():
+    """Start the background refresher once per process."""
+    global _thread
+    if _thread is None:
+        current()
+        _thread = threading.Thread(target=_run, name='dashboard-refresh', daemon=True)
+        _thread.start()
+
+
+def publish_forever():
+    """Publisher loop run beside gunicorn: rebuild, publish, and drop versions no worker needs."""
+    while True:
+        time.sleep(REFRESH_INTERVAL)
+        try:
+            shared_data.publish(dashboard_data.build_frames())
+            shared_data.prune()
+        except Exception as e:
+            print(f"Error publishing dashboard data: {e}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    publish_forever()
@@ -0,0 +1,72 @@
+import functools
+import pandas as pd
+import plotly.graph_objs as go
+import basket
+import figures
+import store
+
+# Stock-vs-benchmark analysis (Scatter.py's scatter of each stock's close
+# against the S&P 500). The benchmark is fetched once per process, the
+# constituents concurrently, and everything is inner-joined on the date index
+# in one pass, so each point pairs a stock's close with the benchmark close of
+# the same day.
+
+BENCHMARK = '^GSPC'
+BENCHMARK_NAMES = {'^GSPC': 'S&P 500', '^IXIC': 'NASDAQ'}
+FIELDS = ['Close', 'Pct Change', 'Volume']
+
+
+def fetch_history(symbol, period='5y'):
+    hist = store.history(symbol, start=store.period_start(period))
+    hist['Pct Change'] = hist['Close'].pct_change() * 100
+    return hist
+
+
+@functools.lru_cache(maxsize=8)
+def benchmark_close(benchmark=BENCHMARK, period='5y'):
+    return fetch_history(benchmark, period)['Close']
+
+
+def align(symbols, benchmark=BENCHMARK, period='5y'):
+    """Constituent fields with (symbol, field) columns and the benchmark close, on the dates they share."""
+    frames = basket.fetch_all(list(symbols), lambda s: fetch_history(s, period)[FIELDS])
+    bench = benchmark_close(benchmark, period)
+    if not frames:
+        return pd.DataFrame(), bench.iloc[:0]
+    stocks = pd.concat(frames, axis=1)
+    joined = stocks.join(bench.rename(('', benchmark)), how='inner')
+    return joined.drop(columns=[('', benchmark)]), joined[('', benchmark)]
+
+
+def scatter_figure(symbols, benchmark=BENCHMARK, period='5y'):
+    """One figure with a marker trace per symbol: its close against the benchmark close on the same day."""
+    stocks, bench = align(symbols, benchmark, period)
+    name = BENCHMARK_NAMES.get(benchmark, benchmark)
+    fig = go.Figure()
+    for symbol in stocks.columns.get_level_values(0).unique():
+        block = stocks[symbol]
+        mask = block['Close'].notna().to_numpy()
+        dates = block.index[mask].strftime('%Y-%m-%d')
+        fig.add_trace(figures.scatter(
+            x=bench.to_numpy()[mask],
+            y=block['Close'].to_numpy()[mask],
+            mode='markers',
+            name=f"{symbol} vs {name}",
+            hovertemplate=(
+                f"<b>{symbol}</b><br><br>"
+                "Date: %{customdata[0]}<br>"
+                f"{name}: %{{x:.2f}}<br>"
+                f"{symbol} Close: %{{y:.2f}}<br>"
+                f"{symbol} % Change: %{{customdata[1]:.2f}}%<br>"
+                "Volume: %{customdata[2]:,}<br>"
+                "<extra></extra>"
+            ),
+            customdata=figures.customdata(dates, block['Pct Change'].to_numpy()[mask], block['Volume'].to_numpy()[mask])
+        ))
+    fig.update_layout(
+        title=f"Stock Prices vs {name}",
+        xaxis_title=f"{name} Close",
+        yaxis_title="Stock Close",
+        showlegend=True
+    )
+    return fig
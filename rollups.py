@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+import store
+
+# Multi-resolution OHLCV rollups behind app.py's timeframe selector.
+# The finest bars we have (1m for recent days, 1d for the long history) are the
+# base levels, and every coarser level is aggregated from the one below it:
+#   1m -> 5m -> 15m -> 30m -> 4h        1d -> 1wk, 1d -> 1mo
+# Frames are wide, with (Price, Ticker) columns like yf.download. Extending a
+# base level only re-aggregates the bins from the first new bar onwards.
+
+# Level -> (parent level, resample rule)
+LEVELS = {
+    '1m': (None, '1min'),
+    '5m': ('1m', '5min'),
+    '15m': ('5m', '15min'),
+    '30m': ('15m', '30min'),
+    '4h': ('30m', '4h'),
+    '1d': (None, '1D'),
+    '1wk': ('1d', 'W-MON'),
+    '1mo': ('1d', 'MS'),
+}
+LEVEL_ORDER = list(LEVELS)
+# Selector values that are lookback periods rather than bar sizes; served from daily bars
+PERIODS = ['3mo', '6mo', '1y', '3y', '5y']
+
+AGGREGATIONS = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Adj Close': 'last', 'Volume': 'sum'}
+
+PRICE_METRICS = ['Price', 'Change %']
+
+
+def rollup(bars, rule):
+    """Aggregate wide OHLCV bars to rule: first open, max high, min low, last close, summed volume."""
+    resampler = {field: bars[field].resample(rule, label='left', closed='left')
+                 for field in AGGREGATIONS if field in bars.columns.get_level_values(0)}
+    aggregated = pd.concat({field: getattr(r, AGGREGATIONS[field])() for field, r in resampler.items()}, axis=1)
+    aggregated.columns.names = bars.columns.names
+    # A ticker that did not trade in a bin has no close; it should not get a zero volume either
+    aggregated['Volume'] = aggregated['Volume'].where(aggregated['Close'].notna())
+    return aggregated[aggregated['Close'].notna().any(axis=1)]
+
+
+def _bin_start(timestamp, rule):
+    offset = to_offset(rule)
+    if isinstance(offset, Tick):
+        return timestamp.floor(offset)
+    return offset.rollback(timestamp.normalize())
+
+
+def _children(level):
+    return [name for name, (parent, _) in LEVELS.items() if parent == level]
+
+
+class Pyramid:
+    def __init__(self):
+        self.levels = {name: None for name in LEVELS}
+
+    def last_timestamp(self, level):
+        bars = self.levels[level]
+        return None if bars is None or bars.empty else bars.index[-1]
+
+    def extend(self, bars, base, keep_from=None):
+        """Merge new base-level bars ('1m' or '1d') and refresh only the affected coarser bins.
+
+        With keep_from, bars before it are dropped from base and the bins
+        before it from the levels above, so a long-running process holds a
+        fixed window instead of everything it has ever been sent.
+        """
+        if not bars.empty:
+            since = bars.index[0]
+            current = self.levels[base]
+            if current is not None:
+                bars = pd.concat([current[current.index < since], bars])
+            self.levels[base] = bars
+            self._refresh_children(base, since)
+        if keep_from is not None:
+            self._trim(base, keep_from)
+
+    def _trim(self, level, keep_from):
+        bars = self.levels[level]
+        if bars is not None and not bars.empty and bars.index[0] < keep_from:
+            self.levels[level] = bars[bars.index >= keep_from]
+        for child in _children(level):
+            # A bin holding keep_from is kept whole
+            self._trim(child, _bin_start(keep_from, LEVELS[child][1]))
+
+    def _refresh_children(self, parent, since):
+        for level in _children(parent):
+            rule = LEVELS[level][1]
+            start = _bin_start(since, rule)
+            source = self.levels[parent]
+            tail = rollup(source[source.index >= start], rule)
+            current = self.levels[level]
+            self.levels[level] = tail if current is None else pd.concat([current[current.index < start], tail])
+            self._refresh_children(level, start)
+
+    def nearest(self, timeframe):
+        """The precomputed level that serves a selector value: itself, or the next coarser level with data."""
+        if timeframe in PERIODS:
+            timeframe = '1d'
+        for level in LEVEL_ORDER[LEVEL_ORDER.index(timeframe):]:
+            if self.levels[level] is not None and not self.levels[level].empty:
+                return level
+        return None
+
+
+def _last_two_closes(close):
+    """Last and second-to-last valid close of every column."""
+    last = close.ffill().iloc[-1]
+    valid_after = close.notna().iloc[::-1].cumsum().iloc[::-1]
+    previous = close.where(valid_after >= 2).ffill().iloc[-1]
+    return last, previous
+
+
+def levels_from_frames(frames):
+    """The rollup levels among a snapshot's frames (published as 'rollup_<level>')."""
+    return {level: frames.get('rollup_' + level) for level in LEVELS}
+
+
+def price_metrics(levels, timeframe):
+    """Latest price and % change per ticker for a selector value, from the rollup frames.
+
+    For a bar size the change is over the last bar at that resolution; for a
+    lookback period it is over the whole period.
+    """
+    pyramid = Pyramid()
+    pyramid.levels.update(levels)
+    level = pyramid.nearest(timeframe)
+    if level is None:
+        return pd.DataFrame(columns=PRICE_METRICS, dtype='float64')
+    close = levels[level]['Close']
+    if timeframe in PERIODS:
+        close = close[close.index >= store.period_start(timeframe)]
+    if close.empty:
+        # No bars in the window (a stale store or a short history): no price or change
+        return pd.DataFrame(np.nan, index=close.columns, columns=PRICE_METRICS)
+    if timeframe in PERIODS:
+        last, previous = close.ffill().iloc[-1], close.bfill().iloc[0]
+    else:
+        last, previous = _last_two_closes(close)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change = (last / previous - 1) * 100
+    return pd.DataFrame({'Price': last, 'Change %': change})
@@ -0,0 +1,161 @@
+import contextlib
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import store
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): requests are only coalesced within a process
+    fcntl = None
+
+# Cache shared by every process on the host, for values that are expensive to
+# fetch or compute and that many requests ask for at the same moment (everyone
+# opening app2 on the default AAPL view). Values are pickled into one SQLite
+# database in WAL mode, so readers in other workers never wait for a writer.
+# A hit only reads: an entry's last-used time, which eviction goes by, is
+# written at most once every USED_RESOLUTION seconds.
+#
+# A miss is single-flight: the process computing a key holds an exclusive file
+# lock for it, and concurrent misses in other workers or threads block on that
+# lock, then read the value it stored instead of computing it again. Locks are
+# striped over LOCK_STRIPES files per cache; a lock is released by the OS if
+# its holder dies, and the next waiter computes the value instead.
+
+PATH = os.environ.get('DASHBOARD_CACHE_PATH', os.path.join(store.DATA_DIR, 'cache.sqlite'))
+# Total size of the pickled values kept; the least recently used go first
+MAX_BYTES = int(os.environ.get('DASHBOARD_CACHE_BYTES', 512 * 1024 * 1024))
+# Seconds a value is served before it is computed again (the store's top-up interval)
+MAX_AGE = float(os.environ.get('DASHBOARD_CACHE_MAX_AGE', store.MAX_AGE))
+LOCK_STRIPES = int(os.environ.get('DASHBOARD_CACHE_LOCK_STRIPES', 64))
+# Seconds an entry's last-used time may lag behind its last hit
+USED_RESOLUTION = 60
+
+# The value comes last: SQLite stores a large blob in overflow pages, and a
+# column after it could only be read by walking through them
+SCHEMA = ('CREATE TABLE IF NOT EXISTS entries (name TEXT, key TEXT, nbytes INTEGER, created REAL, used REAL, '
+          'value BLOB, PRIMARY KEY (name, key))')
+
+_MISSING = object()
+_thread_locks = {}
+_thread_locks_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def single_flight(name, key, path=PATH):
+    """Held by one thread on the host at a time for key (and the keys sharing its stripe) of cache name."""
+    stripe = int(hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest(), 16) % LOCK_STRIPES
+    lock_path = os.path.join(f'{path}.locks', f'{name}-{stripe}.lock')
+    if fcntl is None:
+        with _thread_locks_lock:
+            lock = _thread_locks.setdefault(lock_path, threading.Lock())
+        with lock:
+            yield
+        return
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    # Each call opens the file itself, so threads of one process also exclude each other
+    with open(lock_path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SharedCache:
+    """Values by key in the host-wide database, computed once however many workers miss at the same time.
+
+    name namespaces the keys and locks, so caches sharing the database never collide.
+    """
+
+    def __init__(self, name, path=PATH, max_bytes=MAX_BYTES, max_age=MAX_AGE):
+        self.name = name
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+
+    def _db(self):
+        # sqlite connections are not shared across threads or a fork
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute(SCHEMA)
+            if [row[1] for row in db.execute('PRAGMA table_info(entries)')][-1] != 'value':
+                # Laid out by an older version, with the sizes after the values; it is only a cache
+                db.execute('DROP TABLE IF EXISTS entries')
+                db.execute(SCHEMA)
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def lookup(self, key, default=_MISSING):
+        """The cached value of key, or default if there is none or it is older than max_age."""
+        try:
+            db = self._db()
+            row = db.execute('SELECT value, created, used FROM entries WHERE name = ? AND key = ?',
+                             (self.name, repr(key))).fetchone()
+            now = time.time()
+            if row is None or now - row[1] > self.max_age:
+                return default
+            if now - row[2] > USED_RESOLUTION:
+                db.execute('UPDATE entries SET used = ? WHERE name = ? AND key = ?', (now, self.name, repr(key)))
+        except sqlite3.Error as e:
+            print(f"Error reading shared cache {self.name}: {e}")
+            return default
+        return pickle.loads(row[0])
+
+    def store(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            db = self._db()
+            db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+                       (self.name, repr(key), len(blob), now, now, blob))
+            self._evict(db)
+        except sqlite3.Error as e:
+            print(f"Error writing shared cache {self.name}: {e}")
+
+    def _evict(self, db):
+        total = db.execute('SELECT COALESCE(SUM(nbytes), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for name, key, nbytes in db.execute('SELECT name, key, nbytes FROM entries ORDER BY used'):
+            if total <= self.max_bytes:
+                break
+            evicted.append((name, key))
+            total -= nbytes
+        db.executemany('DELETE FROM entries WHERE name = ? AND key = ?', evicted)
+
+    def get(self, key, compute):
+        """key's value, from the cache or from compute(); concurrent misses for key wait for one compute()."""
+        value = self.lookup(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        with single_flight(self.name, key, self.path):
+            # Whoever held the lock before us may have just stored it
+            value = self.lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            value = compute()
+            self.store(key, value)
+        return value
+
+    def clear(self):
+        try:
+            self._db().execute('DELETE FROM entries WHERE name = ?', (self.name,))
+        except sqlite3.Error as e:
+            print(f"Error clearing shared cache {self.name}: {e}")
@@ -0,0 +1,77 @@
+import os
+import pickle
+import shutil
+import numpy as np
+import pandas as pd
+
+# Publishes the frames built by dashboard_data.build_frames() as read-only,
+# memory-mapped arrays. The gunicorn master publishes once (gunicorn.conf.py);
+# every worker then attaches to the same pages instead of downloading and
+# holding its own copy, so memory stays flat as workers are added.
+#
+# Layout under DASHBOARD_SHARED_DIR:
+#   CURRENT             name of the live version directory
+#   <version>/<name>.npy   frame values as one array of the frame's dtype (float32 or float64)
+#   <version>/<name>.pkl   frame index and columns
+
+def shared_dir():
+    return os.environ.get('DASHBOARD_SHARED_DIR')
+
+
+def publish(frames, directory=None):
+    """Write frames to a new version directory and make it current; returns the version."""
+    directory = directory or shared_dir()
+    version = f"{pd.Timestamp.now():%Y%m%dT%H%M%S%f}-{os.getpid()}"
+    target = os.path.join(directory, version)
+    os.makedirs(target)
+    for name, frame in frames.items():
+        np.save(os.path.join(target, name + '.npy'), np.ascontiguousarray(frame.to_numpy()))
+        with open(os.path.join(target, name + '.pkl'), 'wb') as f:
+            pickle.dump({'index': frame.index, 'columns': frame.columns}, f)
+    # Swap the pointer atomically so a worker never sees a half-written version
+    tmp = os.path.join(directory, f'CURRENT.{os.getpid()}.tmp')
+    with open(tmp, 'w') as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(directory, 'CURRENT'))
+    return version
+
+
+def current_version(directory=None):
+    directory = directory or shared_dir()
+    try:
+        with open(os.path.join(directory, 'CURRENT')) as f:
+            return f.read().strip()
+    except (OSError, TypeError):
+        return None
+
+
+def published_at(version, directory=None):
+    """Epoch seconds at which a version was published."""
+    directory = directory or shared_dir()
+    return os.path.getmtime(os.path.join(directory, version))
+
+
+def prune(keep=2, directory=None):
+    """Remove all but the newest versions. Workers still mapping a removed file keep their pages."""
+    directory = directory or shared_dir()
+    versions = sorted(name for name in os.listdir(directory)
+                      if os.path.isdir(os.path.join(directory, name)))
+    for version in versions[:-keep]:
+        shutil.rmtree(os.path.join(directory, version), ignore_errors=True)
+
+
+def attach(version, directory=None):
+    """Frames of a published version, backed by the shared memory-mapped files (no copy)."""
+    directory = directory or shared_dir()
+    source = os.path.join(directory, version)
+    frames = {}
+    for filename in os.listdir(source):
+        if not filename.endswith('.npy'):
+            continue
+        name = filename[:-len('.npy')]
+        values = np.load(os.path.join(source, filename), mmap_mode='r')
+        with open(os.path.join(source, name + '.pkl'), 'rb') as f:
+            meta = pickle.load(f)
+        frames[name] = pd.DataFrame(values, index=meta['index'], columns=meta['columns'], copy=False)
+    return frames
+
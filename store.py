@@ -0,0 +1,253 @@
+import os
+import re
+import time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import providers
+
+# Local OHLCV store: one Parquet file per provider, symbol and interval.
+# Every price read in the dashboards goes through here, and the network is only
+# asked for bars newer than the last stored timestamp (or older than the first
+# one, when a longer history than we hold is requested).
+
+DATA_DIR = os.environ.get('DASHBOARD_DATA_DIR',
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+
+# Seconds a stored file is trusted before we ask for newer bars again
+MAX_AGE = float(os.environ.get('DASHBOARD_STORE_MAX_AGE', 15 * 60))
+
+# Stored columns: unadjusted prices plus what we need to auto-adjust on read
+STORE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume', 'Dividends', 'Stock Splits']
+# Columns of a yf.download frame, in the order yfinance returns them
+DOWNLOAD_COLUMNS = ['Adj Close', 'Close', 'High', 'Low', 'Open', 'Volume']
+# Columns of a yf.Ticker(...).history frame
+HISTORY_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+
+# Symbols per bulk request when many need fetching at once
+CHUNK_SIZE = int(os.environ.get('DASHBOARD_STORE_CHUNK_SIZE', 100))
+
+# Symbols served from the files alone, and symbols that needed the network, since start
+hits = 0
+misses = 0
+
+_PERIOD_RE = re.compile(r'^(\d+)(d|wk|mo|y)$')
+_PERIOD_UNITS = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+
+
+def _path(symbol, interval):
+    # Namespaced by provider so replayed or synthetic bars never mix with real ones
+    return os.path.join(DATA_DIR, providers.get_provider().name, interval,
+                        symbol.replace('/', '_') + '.parquet')
+
+
+def _empty():
+    return pd.DataFrame(columns=STORE_COLUMNS, index=pd.DatetimeIndex([], name='Date'), dtype='float64')
+
+
+def period_start(period):
+    """Translate a yfinance period string ('5d', '6mo', '5y', 'ytd') into a start date."""
+    today = pd.Timestamp.now().normalize()
+    if period == 'ytd':
+        return today.replace(month=1, day=1)
+    match = _PERIOD_RE.match(period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == 'd':
+        # Day periods count trading bars; leave room for weekends and holidays
+        # and let the caller keep the last n rows.
+        return today - pd.DateOffset(days=2 * n + 4)
+    return today - pd.DateOffset(**{_PERIOD_UNITS[unit]: n})
+
+
+def load(symbol, interval='1d'):
+    """Return the stored bars for a symbol and the store metadata saved with them."""
+    path = _path(symbol, interval)
+    if not os.path.exists(path):
+        return _empty(), {}
+    table = pq.read_table(path)
+    meta = {k.decode()[len('store.'):]: v.decode()
+            for k, v in (table.schema.metadata or {}).items() if k.startswith(b'store.')}
+    return table.to_pandas(), meta
+
+
+def save(symbol, interval, bars, covered_from, fetched_at):
+    path = _path(symbol, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(bars, preserve_index=True)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b'store.covered_from'] = covered_from.isoformat().encode()
+    metadata[b'store.fetched_at'] = repr(fetched_at).encode()
+    table = table.replace_schema_metadata(metadata)
+    # Write next to the target and rename, so readers never see a partial file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+def _normalize(bars):
+    if bars is None or bars.empty:
+        return _empty()
+    if bars.index.tz is not None:
+        bars.index = bars.index.tz_localize(None)
+    bars.index.name = 'Date'
+    return bars.reindex(columns=STORE_COLUMNS).astype('float64')
+
+
+def _fetch(symbol, start, end, interval):
+    try:
+        bars = providers.get_provider().history(symbol, start=start, end=end, interval=interval,
+                                                auto_adjust=False, actions=True)
+    except Exception as e:
+        print(f"Error fetching data for {symbol}: {e}")
+        return _empty()
+    return _normalize(bars)
+
+
+def _fetch_many(symbols, start, end, interval):
+    """Bars for many symbols from the same start, in bulk requests of CHUNK_SIZE symbols."""
+    fetched = {}
+    for i in range(0, len(symbols), CHUNK_SIZE):
+        chunk = symbols[i:i + CHUNK_SIZE]
+        try:
+            bars = providers.get_provider().history_many(chunk, start=start, end=end, interval=interval)
+        except Exception as e:
+            print(f"Error fetching data for {len(chunk)} symbols from {chunk[0]}: {e}")
+            bars = {}
+        for symbol in chunk:
+            fetched[symbol] = _normalize(bars.get(symbol))
+    return fetched
+
+
+def _combine(older, newer):
+    if older.empty:
+        return newer
+    if newer.empty:
+        return older
+    bars = pd.concat([older, newer])
+    return bars[~bars.index.duplicated(keep='last')].sort_index()
+
+
+def get_history(symbol, start, end=None, interval='1d'):
+    """Stored, unadjusted bars for symbol in [start, end), topped up from the network when needed."""
+    return get_histories([symbol], start, end, interval)[symbol]
+
+
+def get_histories(symbols, start, end=None, interval='1d', keep_from=None):
+    """get_history for many symbols; whatever has to come from the network is fetched in bulk chunks.
+
+    With keep_from, stored bars before it are dropped from the files, so a
+    window that is topped up forever (1m bars) does not grow forever.
+    """
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end) if end is not None else None
+    now = time.time()
+
+    stored = {}
+    missing, backfill, stale = [], {}, []
+    for symbol in dict.fromkeys(symbols):
+        bars, meta = load(symbol, interval)
+        covered_from = pd.Timestamp(meta['covered_from']) if 'covered_from' in meta else None
+        stored[symbol] = [bars, covered_from, float(meta.get('fetched_at', 0))]
+        if bars.empty or covered_from is None:
+            missing.append(symbol)
+            continue
+        if start < covered_from:
+            # Symbols stored together share covered_from, so they backfill together
+            backfill.setdefault(covered_from, []).append(symbol)
+        if now - stored[symbol][2] > MAX_AGE and (end is None or end > bars.index[-1]):
+            stale.append(symbol)
+
+    global hits, misses
+    fetching = set(missing).union(stale, *backfill.values())
+    misses += len(fetching)
+    hits += len(stored) - len(fetching)
+
+    changed = set(missing)
+    for symbol, bars in _fetch_many(missing, start, None, interval).items():
+        stored[symbol] = [bars, start, time.time()]
+
+    for covered_from, group in backfill.items():
+        for symbol, older in _fetch_many(group, start, covered_from, interval).items():
+            stored[symbol][0] = _combine(older, stored[symbol][0])
+            stored[symbol][1] = start
+            changed.add(symbol)
+
+    # Top-ups re-request each symbol's last stored bar too: it may have been a partial one.
+    # A chunk is fetched from its earliest last bar; the overlap is deduplicated on merge.
+    stale.sort(key=lambda symbol: stored[symbol][0].index[-1])
+    for i in range(0, len(stale), CHUNK_SIZE):
+        chunk = stale[i:i + CHUNK_SIZE]
+        fetched = _fetch_many(chunk, stored[chunk[0]][0].index[-1], None, interval)
+        for symbol, newer in fetched.items():
+            bars, covered_from, _ = stored[symbol]
+            last = bars.index[-1]
+            actions = newer.loc[newer.index > last, ['Dividends', 'Stock Splits']]
+            if (actions.fillna(0) != 0).any().any():
+                # A dividend or split rewrites Adj Close for the whole history
+                bars = _fetch(symbol, covered_from, None, interval)
+            else:
+                bars = _combine(bars, newer)
+            stored[symbol] = [bars, covered_from, time.time()]
+            changed.add(symbol)
+
+    if keep_from is not None:
+        keep_from = pd.Timestamp(keep_from)
+        for symbol, entry in stored.items():
+            bars, covered_from, _ = entry
+            if not bars.empty and bars.index[0] < keep_from:
+                # Older bars are backfilled again if someone asks for them
+                entry[0], entry[1] = bars.loc[bars.index >= keep_from], max(covered_from, keep_from)
+                changed.add(symbol)
+
+    histories = {}
+    for symbol, (bars, covered_from, fetched_at) in stored.items():
+        if symbol in changed and not bars.empty:
+            save(symbol, interval, bars, covered_from, fetched_at)
+        bars = bars.loc[bars.index >= start]
+        if end is not None:
+            bars = bars.loc[bars.index < end]
+        histories[symbol] = bars
+    return histories
+
+
+def history(symbol, start, end=None, interval='1d', auto_adjust=True):
+    """Bars shaped like yf.Ticker(symbol).history(start=..., end=...)."""
+    bars = get_history(symbol, start, end, interval)
+    if auto_adjust:
+        # Same adjustment yfinance applies: scale OHLC by Adj Close / Close
+        ratio = bars['Adj Close'] / bars['Close']
+        bars = bars.copy()
+        for column in ['Open', 'High', 'Low']:
+            bars[column] = bars[column] * ratio
+        bars['Close'] = bars['Adj Close']
+        return bars[HISTORY_COLUMNS]
+    return bars
+
+
+def download(tickers, period=None, start=None, end=None, interval='1d', fields=DOWNLOAD_COLUMNS, keep_from=None):
+    """Bars for several tickers shaped like yf.download(tickers, ...): (Price, Ticker) columns.
+
+    fields limits the Price level to the columns the caller uses; keep_from
+    trims the stored files as in get_histories.
+    """
+    single = isinstance(tickers, str)
+    tickers = tickers.split() if single else list(tickers)
+    keep_last = None
+    if period is not None:
+        start = period_start(period)
+        if period.endswith('d'):
+            keep_last = int(period[:-1])
+
+    frames = {}
+    for ticker, bars in get_histories(tickers, start, end, interval, keep_from).items():
+        bars = bars[list(fields)]
+        frames[ticker] = bars.tail(keep_last) if keep_last else bars
+
+    if single and len(tickers) == 1:
+        return frames[tickers[0]]
+    data = pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
+    data.columns.names = ['Price', 'Ticker']
+    data.index.name = 'Date'
+    return data
@@ -0,0 +1,116 @@
+import math
+import os
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+# Server-side paging, sorting and filtering for the summary (movers) tables.
+# Each partition of the universe (equities, cryptocurrencies) is indexed once
+# per snapshot: its tickers and changes as arrays, plus every sort order the
+# table offers. A table is a subset of one partition in its default order, so
+# a page request is a boolean mask over the partition and a walk down a
+# precomputed order; only the rows on the visible page are formatted.
+
+PAGE_SIZE = int(os.environ.get('SUMMARY_PAGE_SIZE', 10))
+
+# Column ids of every summary table
+STOCK = 'Stock'
+CHANGE = 'Change %'
+
+# A table's rows: member is a mask over its partition, order its default row order
+Table = namedtuple('Table', ['title', 'partition', 'member', 'order'])
+
+# Filter operators as the DataTable writes them, longest symbols first
+OPERATORS = [('>=', 'ge'), ('<=', 'le'), ('!=', 'ne'), ('<', 'lt'), ('>', 'gt'), ('=', 'eq'),
+             ('ge', 'ge'), ('le', 'le'), ('ne', 'ne'), ('lt', 'lt'), ('gt', 'gt'), ('eq', 'eq'),
+             ('contains', 'contains')]
+
+
+class Partition:
+    """Tickers and changes of one partition, with an ascending and descending order per column."""
+
+    def __init__(self, change):
+        self.tickers = change.index.to_numpy(dtype=str)
+        self.upper = np.char.upper(self.tickers)
+        self.change = change.to_numpy(dtype='float64')
+        self.position = pd.Index(change.index)
+        # Stable argsorts put NaN last; -change keeps it last for descending too
+        self.orders = {
+            (STOCK, 'asc'): np.argsort(self.tickers, kind='stable'),
+            (CHANGE, 'asc'): np.argsort(self.change, kind='stable'),
+            (CHANGE, 'desc'): np.argsort(-self.change, kind='stable'),
+        }
+        self.orders[(STOCK, 'desc')] = self.orders[(STOCK, 'asc')][::-1]
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def table(self, title, name, rows):
+        """A table of rows (a Series indexed by tickers of this partition), shown in rows' order."""
+        order = self.position.get_indexer(rows.index)
+        member = np.zeros(len(self), dtype=bool)
+        member[order] = True
+        return Table(title, name, member, order)
+
+
+def parse_filter(query):
+    """(column, operator, value) for each clause of a DataTable filter_query; unparseable clauses are skipped."""
+    clauses = []
+    for part in (query or '').split(' && '):
+        part = part.strip()
+        if not part.startswith('{') or '}' not in part:
+            continue
+        column, rest = part[1:].split('}', 1)
+        rest = rest.strip()
+        for symbol, operator in OPERATORS:
+            if rest.startswith(symbol):
+                value = rest[len(symbol):].strip()
+                if len(value) > 1 and value[0] == value[-1] and value[0] in '"\'`':
+                    value = value[1:-1]
+                clauses.append((column, operator, value))
+                break
+    return clauses
+
+
+def _compare(values, operator, value):
+    if operator == 'contains':
+        operator = 'eq'
+    return {'eq': values == value, 'ne': values != value, 'lt': values < value,
+            'le': values <= value, 'gt': values > value, 'ge': values >= value}[operator]
+
+
+def filter_mask(partition, query):
+    """Rows of partition matching every clause of query."""
+    mask = np.ones(len(partition), dtype=bool)
+    for column, operator, value in parse_filter(query):
+        if column == STOCK:
+            # Tickers match case-insensitively
+            value = value.upper()
+            if operator == 'contains':
+                mask &= np.char.find(partition.upper, value) >= 0
+            else:
+                mask &= _compare(partition.upper, operator, value)
+        elif column == CHANGE:
+            try:
+                value = float(value.rstrip('%'))
+            except ValueError:
+                continue
+            # Compare at the precision the table shows
+            mask &= _compare(np.round(partition.change, 2), operator, value)
+    return mask
+
+
+def page(table, partition, page_current=0, page_size=PAGE_SIZE, sort_by=None, filter_query=''):
+    """(records, page_count) for one page of table, sorted and filtered as the DataTable asks."""
+    mask = table.member & filter_mask(partition, filter_query) if filter_query else table.member
+    order = table.order
+    if sort_by:
+        # A single sort (sort_mode='single'): the first column wins
+        order = partition.orders.get((sort_by[0]['column_id'], sort_by[0]['direction']), order)
+    rows = order[mask[order]]
+
+    start = (page_current or 0) * page_size
+    visible = rows[start:start + page_size]
+    records = [{STOCK: ticker, CHANGE: f"{round(change, 2)}%"}
+               for ticker, change in zip(partition.tickers[visible], partition.change[visible].tolist())]
+    return records, max(1, math.ceil(len(rows) / page_size))
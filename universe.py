@@ -0,0 +1,47 @@
+import os
+import pandas as pd
+
+# The tickers the dashboards cover, read from a CSV with one row per ticker:
+#   ticker,sector,asset_class
+# asset_class is one of ASSET_CLASSES. Point DASHBOARD_UNIVERSE at a larger
+# file (the S&P 500, hundreds of crypto pairs) to scale the dashboards up;
+# nothing else lists tickers by hand.
+
+PATH = os.environ.get('DASHBOARD_UNIVERSE',
+                      os.path.join(os.path.dirname(os.path.abspath(__file__)), 'universe.csv'))
+
+ASSET_CLASSES = ['equity', 'crypto', 'index']
+COLUMNS = ['ticker', 'sector', 'asset_class']
+
+
+def load(path=PATH):
+    """The universe as a frame indexed by ticker, with categorical sector and asset_class."""
+    frame = pd.read_csv(path, dtype=str, skipinitialspace=True)
+    missing = set(COLUMNS) - set(frame.columns)
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(sorted(missing))}")
+    frame = frame[COLUMNS].dropna(subset=['ticker'])
+    unknown = set(frame['asset_class']) - set(ASSET_CLASSES)
+    if unknown:
+        raise ValueError(f"{path} has unknown asset classes: {', '.join(sorted(unknown))}")
+    frame = frame.drop_duplicates('ticker').set_index('ticker')
+    # Sectors keep the order they first appear in, which is the order the dashboards show them in
+    frame['sector'] = pd.Categorical(frame['sector'], categories=frame['sector'].dropna().unique())
+    frame['asset_class'] = pd.Categorical(frame['asset_class'], categories=ASSET_CLASSES)
+    return frame
+
+
+def tickers(frame, asset_class=None, sector=None):
+    """Tickers of one asset class and/or sector, in file order."""
+    mask = pd.Series(True, index=frame.index)
+    if asset_class is not None:
+        mask &= frame['asset_class'] == asset_class
+    if sector is not None:
+        mask &= frame['sector'] == sector
+    return frame.index[mask].tolist()
+
+
+def sectors(frame, asset_class='equity'):
+    """Sectors that hold tickers of an asset class, in file order."""
+    present = set(frame.loc[frame['asset_class'] == asset_class, 'sector'].dropna())
+    return [sector for sector in frame['sector'].cat.categories if sector in present]